@@ -19,44 +19,28 @@ Estrutura de alto nível
 
 import os
 import re
+import csv
 import unicodedata
-import base64
+import hashlib
+import html
 import mimetypes
 import io
+import itertools
+import functools
 from urllib.parse import urlencode
+from collections import namedtuple
 from pathlib import Path
 
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-# Import robusto do unidecode com fallback funcional
 try:
-    from unidecode import unidecode
-    UNIDECODE_AVAILABLE = True
+    # Opcional: base64 acelerado por SIMD (pip install pybase64); mesma API do stdlib
+    from pybase64 import b64encode  # type: ignore
 except ImportError:
-    UNIDECODE_AVAILABLE = False
-    # Fallback simples que remove acentos básicos
-    def unidecode(text):
-        if not isinstance(text, str):
-            return str(text)
-        replacements = {
-            'á': 'a', 'à': 'a', 'ã': 'a', 'â': 'a', 'ä': 'a',
-            'é': 'e', 'è': 'e', 'ê': 'e', 'ë': 'e',
-            'í': 'i', 'ì': 'i', 'î': 'i', 'ï': 'i',
-            'ó': 'o', 'ò': 'o', 'õ': 'o', 'ô': 'o', 'ö': 'o',
-            'ú': 'u', 'ù': 'u', 'û': 'u', 'ü': 'u',
-            'ç': 'c', 'ñ': 'n',
-            'Á': 'A', 'À': 'A', 'Ã': 'A', 'Â': 'A', 'Ä': 'A',
-            'É': 'E', 'È': 'E', 'Ê': 'E', 'Ë': 'E',
-            'Í': 'I', 'Ì': 'I', 'Î': 'I', 'Ï': 'I',
-            'Ó': 'O', 'Ò': 'O', 'Õ': 'O', 'Ô': 'O', 'Ö': 'O',
-            'Ú': 'U', 'Ù': 'U', 'Û': 'U', 'Ü': 'U',
-            'Ç': 'C', 'Ñ': 'N'
-        }
-        for accented, unaccented in replacements.items():
-            text = text.replace(accented, unaccented)
-        return text
+    from base64 import b64encode
 
 try:
     # Opcional: auto-refresh sem JS (pip install streamlit-autorefresh)
@@ -64,20 +48,20 @@ try:
 except Exception:
     st_autorefresh = None
 from stats import (
-    overall_stats,
     episode_completion,
-    status_breakdown,
-    urgency_breakdown,
-    responsavel_breakdown,
+    summary_stats,
 )
 from timeline import render_timeline_tab
-from list_tab import render_list_tab
+from list_tab import render_list_tab, OPEN_TASK_COLUMN_ALIASES
+from text_keys import normalize_text, norm_key, NONALNUM_RE, image_id_keys, resp_style
 
 # Paths
 # BASE_DIR: raiz do projeto; CSV_PATH: caminho do CSV; IMG_DIR: pasta com imagens dos personagens
+# THUMB_CACHE_DIR: miniaturas geradas (cache em disco, pode ser apagado a qualquer momento)
 BASE_DIR = Path(__file__).parent
 CSV_PATH = BASE_DIR / "SVB_INDEX.xlsx - RIG.csv"
 IMG_DIR = BASE_DIR / "personagens"
+THUMB_CACHE_DIR = BASE_DIR / ".cache" / "thumbs"
 
 # CSV column names (padrão interno). Mantemos nomes antigos para compatibilidade;
 # ao ler o CSV, renomeamos colunas novas/antigas para estes identificadores.
@@ -97,6 +81,31 @@ COL_COMMENTS = "COMENTÁRIOS"
 COL_DATE_CONCEPT = "Entrega Concept"
 COL_DATE_RIG = "Entrega Rig"
 
+# Classes de cor das badges por valor normalizado (status: padrão 'amber'; urgência: 'gray')
+STATUS_CLS = {
+    'concluido': 'green',
+    'em andamento': 'blue', 'fazendo': 'blue', 'andamento': 'blue',
+    'a fazer': 'gray', 'pendente': 'gray', 'todo': 'gray',
+    'bloqueado': 'red', 'impedido': 'red',
+}
+URG_CLS = {'alta': 'red', 'media': 'amber', 'baixa': 'green'}
+
+# Colunas auxiliares de ordenação (minúsculas), criadas em build_base_exp
+SORT_KEY_COLS = {
+    COL_NAME: "__sort_name__",
+    COL_FILE_ID: "__sort_id__",
+    COL_URG_CONCEPT: "__sort_urg_c__",
+    COL_URG_RIG: "__sort_urg_r__",
+    COL_STATUS_CONCEPT: "__sort_status_c__",
+    COL_STATUS_RIG: "__sort_status_r__",
+    COL_RESP_CONCEPT: "__sort_resp_c__",
+    COL_RESP_RIG: "__sort_resp_r__",
+}
+
+# Modo Tabela: até este número de linhas usa <table> HTML estático (leve);
+# acima disso volta ao st.dataframe (grade virtualizada)
+HTML_TABLE_MAX_ROWS = 500
+
 # ----------------- Helpers -----------------
 # Funções auxiliares para lidar com textos, chaves, episódios e imagens.
 
@@ -117,33 +126,38 @@ def coalesce(*vals):
     return ""
 
 
-def _normalize_text(s: str) -> str:
-    """Normaliza texto: minúsculas, remove acentos/diacríticos e espaços extremos.
+def search_key(s: str) -> str:
+    """Chave de busca: decompõe (NFKD), descarta o que não é ASCII, minúsculas e mantém a-z0-9.
 
-    Útil para comparar valores (status, urgência, nomes) de forma robusta.
+    Mesma regra de search_key_col, usada para as colunas da base.
     """
-    if not s:
-        return ""
-    s = unicodedata.normalize("NFD", s.strip().lower())
-    return "".join(ch for ch in s if not unicodedata.combining(ch))
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    return NONALNUM_RE.sub("", s.lower())
 
 
-def norm_key(s: str) -> str:
-    """Cria uma chave "segura" (apenas a-z0-9) a partir de um texto normalizado."""
-    s = _normalize_text(s)
-    return re.sub(r"[^a-z0-9]+", "", s)
+def search_key_col(s: pd.Series) -> pd.Series:
+    """Versão vetorizada de search_key (operações de string do pandas, uma passada)."""
+    return (
+        s.astype(str).str.normalize("NFKD")
+        .str.encode("ascii", "ignore").str.decode("ascii")
+        .str.lower().str.replace(NONALNUM_RE, "", regex=True)
+    )
 
 
 def is_concluido(s: str) -> bool:
     """Retorna True se o status normalizado for 'concluido'."""
-    return _normalize_text(s) == "concluido"
+    return normalize_text(s) == "concluido"
 
 
 def normalize_responsavel(s: str) -> str:
     """Normaliza alias de responsáveis (ex.: 'Oto' -> 'OTONIEL')."""
     raw = coalesce(s)
     mapping = {"oto": "OTONIEL"}
-    return mapping.get(_normalize_text(raw), raw)
+    return mapping.get(normalize_text(raw), raw)
+
+
+_EP_NUM_RE = re.compile(r"\d+")
+_TODOS = frozenset({"todos"})
 
 
 def parse_episode_field(ep_field: str):
@@ -155,57 +169,67 @@ def parse_episode_field(ep_field: str):
     """
     if not ep_field:
         return []
-    ep_field = str(ep_field).strip()
-    if not ep_field:
-        return []
-    if ep_field.lower() == "todos":
+    s = ep_field if isinstance(ep_field, str) else str(ep_field)
+    if s.strip().lower() in _TODOS:
         return ["Todos"]
     # Extrai todos os números
-    return [int(n) for n in re.findall(r"\d+", ep_field)]
+    return list(map(int, _EP_NUM_RE.findall(s)))
 
 
 def detect_all_numeric_episodes(df: pd.DataFrame):
-    """Extrai e ordena todos os episódios numéricos presentes no DataFrame."""
-    eps = set()
-    for raw in df.get(COL_EP, []).tolist():
-        for p in parse_episode_field(raw):
-            if isinstance(p, int):
-                eps.add(p)
-    return sorted(eps)
+    """Extrai e ordena todos os episódios numéricos presentes no DataFrame.
 
+    Uma única varredura de regex sobre a coluna concatenada ('Todos' não tem dígitos).
+    """
+    if COL_EP not in df.columns:
+        return []
+    blob = " ".join(df[COL_EP].dropna().astype(str))
+    return sorted({int(n) for n in _EP_NUM_RE.findall(blob)})
+
+
+ImageIndex = namedtuple('ImageIndex', ['exact', 'rank', 'substrings', 'memo', 'mtimes'])
 
-def index_images(img_dir: Path):
-    """Cria um índice {chave_normalizada: caminho_imagem} a partir dos arquivos da pasta.
+
+def index_images(img_dir: Path) -> ImageIndex:
+    """Cria o índice de imagens a partir dos arquivos da pasta.
 
     - Aceita extensões comuns (png, jpg, jpeg, webp, gif).
     - Usa o nome do arquivo (sem extensão) como base para a chave.
     - Apenas arquivos cujo nome comece com 'SVB_' são indexados (regra de negócio solicitada).
+
+    Campos do índice:
+    - exact: {chave_normalizada: caminho_imagem}, na ordem da pasta.
+    - rank: {chave_normalizada: posição}, para desempatar como a varredura em ordem.
+    - substrings: {substring (>= 4 chars): primeira chave que a contém}.
+    - memo: resultados já resolvidos por find_image_for.
+    - mtimes: {caminho_imagem: mtime_ns}, lido na mesma varredura (evita os.stat por card).
     """
     idx = {}
-    if not img_dir.is_dir():
-        return idx
-    for p in img_dir.iterdir():
-        if p.suffix.lower() not in {".png", ".jpg", ".jpeg", ".webp", ".gif"}:
-            continue
-        # Exigir prefixo SVB_ no nome do arquivo
-        if not p.stem.upper().startswith("SVB_"):
-            continue
-        key = norm_key(p.stem)
-        if key and key not in idx:
-            idx[key] = str(p)
-    return idx
-
-
-def _strip_prefixes(s: str) -> str:
-    """Remove prefixos comuns de IDs (ex.: 'svb_rig_', 'rig_', 'per_')."""
-    s2 = _normalize_text(s)
-    for pref in ("svb_rig_", "svb_per_", "svb_", "rig_", "per_"):
-        if s2.startswith(pref):
-            return s2[len(pref):]
-    return s2
-
-
-def find_image_for(img_idx: dict, file_id: str, name: str) -> str:
+    mtimes = {}
+    if img_dir.is_dir():
+        for p in img_dir.iterdir():
+            if p.suffix.lower() not in {".png", ".jpg", ".jpeg", ".webp", ".gif"}:
+                continue
+            # Exigir prefixo SVB_ no nome do arquivo
+            if not p.stem.upper().startswith("SVB_"):
+                continue
+            key = norm_key(p.stem)
+            if key and key not in idx:
+                idx[key] = str(p)
+                try:
+                    mtimes[idx[key]] = p.stat().st_mtime_ns
+                except OSError:
+                    mtimes[idx[key]] = 0
+    rank = {k: i for i, k in enumerate(idx)}
+    subs = {}
+    for key in idx:
+        for i in range(len(key) - 3):
+            for j in range(i + 4, len(key) + 1):
+                subs.setdefault(key[i:j], key)
+    return ImageIndex(idx, rank, subs, {}, mtimes)
+
+
+def find_image_for(img_idx: ImageIndex, file_id: str, name: str) -> str:
     """Localiza imagem por ID e nome com múltiplas estratégias de matching.
 
     Estratégias em ordem de prioridade:
@@ -214,49 +238,31 @@ def find_image_for(img_idx: dict, file_id: str, name: str) -> str:
     3. Match por nome normalizado
     4. Match parcial por partes do nome
     5. Match por ID sem prefixos (base)
+
+    Resultados são memorizados no próprio índice por (ID, nome).
     """
     fid = (file_id or "").strip()
     name = (name or "").strip()
-    
-    def try_match(candidate_id: str) -> str:
-        key = norm_key(candidate_id)
-        return img_idx.get(key, "")
-    
-    # Estratégia 1: Match exato do ID
-    if fid and fid.upper().startswith("SVB_"):
-        result = try_match(fid)
-        if result:
-            return result
-        
-        # Estratégia 2: Variações RIG/PER do ID
-        up = fid.upper()
-        if up.startswith("SVB_RIG_"):
-            # Tenta SVB_PER_
-            result = try_match("SVB_PER_" + fid[8:])
-            if result:
-                return result
-            # Tenta base SVB_
-            base = fid[8:]  # Remove SVB_RIG_
-            result = try_match("SVB_" + base)
-            if result:
-                return result
-        elif up.startswith("SVB_PER_"):
-            # Tenta SVB_RIG_
-            result = try_match("SVB_RIG_" + fid[8:])
-            if result:
-                return result
-            # Tenta base SVB_
-            base = fid[8:]  # Remove SVB_PER_
-            result = try_match("SVB_" + base)
-            if result:
-                return result
-        elif up.startswith("SVB_"):
-            # Para IDs SVB_ simples, tenta adicionar RIG/PER
-            base = fid[4:]  # Remove SVB_
-            for prefix in ["SVB_RIG_", "SVB_PER_"]:
-                result = try_match(prefix + base)
-                if result:
-                    return result
+    memo_key = (fid, name)
+    hit = img_idx.memo.get(memo_key)
+    if hit is None:
+        hit = img_idx.memo[memo_key] = _find_image_uncached(img_idx, fid, name)
+    return hit
+
+
+def has_image_for_id(img_idx: ImageIndex, file_id: str) -> bool:
+    """True se find_image_for acharia imagem só pelo ID (sem recorrer ao nome)."""
+    exact = img_idx.exact
+    return any(k in exact for k in image_id_keys((file_id or "").strip()))
+
+
+def _find_image_uncached(img_idx: ImageIndex, fid: str, name: str) -> str:
+    exact = img_idx.exact
+
+    # Estratégias 1 e 2: ID exato e variações RIG/PER
+    for key in image_id_keys(fid):
+        if key in exact:
+            return exact[key]
     
     # Estratégia 3: Match por nome normalizado
     if name:
@@ -293,38 +299,79 @@ def find_image_for(img_idx: dict, file_id: str, name: str) -> str:
         if words:
             name_variants.append(words[0])
         
-        # Match direto com variações
+        # Match direto com variações (as chaves do índice já são a-z0-9, sem '_')
         for variant in name_variants:
-            for idx_key, path in img_idx.items():
-                # Extrai a parte útil do nome do arquivo (remove SVB_RIG_, SVB_PER_, etc.)
-                file_name_parts = idx_key.replace('svb_rig_', '').replace('svb_per_', '').replace('svb_', '')
-                
-                # Match exato
-                if variant == file_name_parts:
-                    return path
+            if variant in exact:
+                return exact[variant]
         
         # Estratégia 4: Match parcial por partes do nome
+        rank = img_idx.rank
         for variant in name_variants:
-            for idx_key, path in img_idx.items():
-                file_name_parts = idx_key.replace('svb_rig_', '').replace('svb_per_', '').replace('svb_', '')
-                
-                # Match se o nome contém ou está contido no arquivo
-                if (variant in file_name_parts and len(variant) >= 4) or \
-                   (file_name_parts in variant and len(file_name_parts) >= 4):
-                    return path
+            # Arquivos que contêm o nome
+            found = img_idx.substrings.get(variant) if len(variant) >= 4 else None
+            # Arquivos contidos no nome (chaves >= 4 chars entre as substrings da variação)
+            for i in range(len(variant) - 3):
+                for j in range(i + 4, len(variant) + 1):
+                    k = variant[i:j]
+                    if k in rank and (found is None or rank[k] < rank[found]):
+                        found = k
+            if found is not None:
+                return exact[found]
         
         # Estratégia 5: Match usando partes do nome divididas
         for part in words:
             if len(part) >= 4:  # Palavras maiores têm prioridade
-                for idx_key, path in img_idx.items():
-                    if part in idx_key:
-                        return path
+                found = img_idx.substrings.get(part)
+                if found is not None:
+                    return exact[found]
     
     return ""
 
 
 # ----------------- Data loading -----------------
 
+# Colunas do CSV usadas pelo app e pelas abas (chaves norm_key, sem o sufixo '.1' do pandas).
+# Inclui os cabeçalhos do layout novo, os nomes internos do layout antigo e os aliases
+# que a aba Lista procura (OPEN_TASK_COLUMN_ALIASES), para as duas listas não divergirem.
+_KEEP_COL_KEYS = frozenset({
+    "eps", "episodio", "episodios", "nome", "nomepersonagem", "nomedopersonagem", "personagem",
+    "id", "linkrig", "linkdorig", "syncsketch", "linksconcept", "linkconcept", "linkdoconcept",
+    "statusrig", "statusconcept", "vetorizacao", "responsavel", "respondavel",
+    "responsavelconcept", "responsavelvetorizacao", "urgencia", "entrega", "comentarios",
+    "comentario", "revisoesconcept", "revisoesrig",
+}) | {norm_key(c) for c in (
+    COL_EP, COL_NAME, COL_FILE_ID, COL_RIG_LINK, COL_SYNCSKETCH, COL_CONCEPT_LINK, COL_URG_CONCEPT,
+    COL_STATUS_CONCEPT, COL_RESP_CONCEPT, COL_STATUS_RIG, COL_RESP_RIG, COL_COMMENTS,
+    COL_DATE_CONCEPT, COL_DATE_RIG,
+)} | {norm_key(c) for cands in OPEN_TASK_COLUMN_ALIASES.values() for c in cands}
+_DUP_SUFFIX_RE = re.compile(r"\.\d+$")
+
+
+def _keep_csv_column(col: str) -> bool:
+    """Filtro de usecols: descarta colunas que ninguém lê (ex.: MODEL SHEET, banner vazio)."""
+    return norm_key(_DUP_SUFFIX_RE.sub("", str(col))) in _KEEP_COL_KEYS
+
+
+def _sniff_header_row(csv_path: Path) -> int:
+    """Decide a linha do cabeçalho (0 ou 1) lendo só as duas primeiras linhas do CSV.
+
+    Usa a linha 1 quando a 0 não tem a coluna de episódios (ou é o banner
+    'SENSACIONAL ...') e a linha seguinte tem. Evita ler o arquivo inteiro duas vezes.
+    """
+    try:
+        with open(csv_path, encoding="utf-8-sig", newline="") as f:
+            # Linhas vazias são ignoradas, como no read_csv
+            rows = list(itertools.islice((r for r in csv.reader(f) if r), 2))
+        keys0 = {norm_key(c) for c in rows[0]}
+        if ("eps" not in keys0 and "episodio" not in keys0) or any("sensacional" in k for k in keys0):
+            keys1 = {norm_key(c) for c in rows[1]}
+            if "eps" in keys1 or "episodio" in keys1:
+                return 1
+    except Exception:
+        pass
+    return 0
+
+
 @st.cache_data(show_spinner=False)
 def load_dataframe(csv_path: Path) -> pd.DataFrame:
     """Lê o CSV com encoding utf-8-sig e normaliza colunas importantes.
@@ -333,18 +380,11 @@ def load_dataframe(csv_path: Path) -> pd.DataFrame:
     O resultado é cacheado para performance enquanto os dados não mudarem.
     """
     # Leitura robusta: alguns CSVs têm uma linha de banner antes do cabeçalho real
-    df = pd.read_csv(csv_path, encoding="utf-8-sig")
-    try:
-        normcols = {norm_key(c) for c in df.columns}
-        if ("eps" not in normcols and "episodio" not in normcols) or any(
-            "sensacional" in norm_key(c) for c in df.columns
-        ):
-            df2 = pd.read_csv(csv_path, encoding="utf-8-sig", header=1)
-            norm2 = {norm_key(c) for c in df2.columns}
-            if ("eps" in norm2 or "episodio" in norm2):
-                df = df2
-    except Exception:
-        pass
+    # dtype=str: todas as colunas são texto para o app (evita inferência de tipos)
+    df = pd.read_csv(
+        csv_path, encoding="utf-8-sig", header=_sniff_header_row(csv_path),
+        usecols=_keep_csv_column, dtype=str,
+    )
 
     # Renomeia colunas de acordo com o novo layout (e mantém compatibilidade com o antigo)
     def _rename_headers_for_schema(df_in: pd.DataFrame) -> pd.DataFrame:
@@ -353,7 +393,7 @@ def load_dataframe(csv_path: Path) -> pd.DataFrame:
             raw = str(col)
             has_suffix = raw.endswith(".1")
             base = raw[:-2] if has_suffix else raw
-            n = _normalize_text(base)
+            n = normalize_text(base)
             nk = norm_key(base)
             # Mapeamentos por base normalizada
             if nk in {"episodio", "episodios", "eps"}:
@@ -392,26 +432,19 @@ def load_dataframe(csv_path: Path) -> pd.DataFrame:
 
     df = _rename_headers_for_schema(df)
     # Colapsar colunas duplicadas (ex.: 'Status do Concept' e 'VETORIZAÇÃO' mapeadas para o mesmo nome)
-    try:
-        dup_names = pd.Index(df.columns)[pd.Index(df.columns).duplicated()].unique().tolist()
-        for name in dup_names:
-            subset = df.loc[:, df.columns == name]
-            # Combina por primeira célula não vazia (prioriza strings não vazias; senão, não-nulos)
-            def _first_nonempty(row):
-                for v in row:
-                    if isinstance(v, str):
-                        if v.strip():
-                            return v
-                    else:
-                        if pd.notna(v):
-                            return v
-                return ''
-            combined = subset.apply(_first_nonempty, axis=1)
-            # Remove todas as ocorrências e recoloca apenas uma
-            df = df.loc[:, ~(df.columns == name)]
-            df[name] = combined
-    except Exception:
-        pass
+    dup_mask = df.columns.duplicated(keep=False)
+    if dup_mask.any():
+        try:
+            # Mantém cada nome na posição da primeira ocorrência
+            out = df.loc[:, ~df.columns.duplicated()].copy()
+            for name in df.columns[dup_mask].unique():
+                # Combina por primeira célula não vazia: strings em branco viram NA e o bfill
+                # na horizontal traz o primeiro valor preenchido para a primeira coluna
+                subset = df.loc[:, df.columns == name].replace(r'^\s*$', pd.NA, regex=True)
+                out[name] = subset.bfill(axis=1).iloc[:, 0].fillna('')
+            df = out
+        except Exception:
+            pass
     # Normalize string columns, apply responsible mapping
     # Garantir coluna de nome e coalescer com PERSONAGEM quando existir
     if COL_NAME in df.columns:
@@ -425,42 +458,63 @@ def load_dataframe(csv_path: Path) -> pd.DataFrame:
     for c in [COL_STATUS_CONCEPT, COL_STATUS_RIG, COL_URG_CONCEPT, COL_URG_RIG, COL_RESP_CONCEPT, COL_RESP_RIG, COL_COMMENTS, COL_DATE_CONCEPT, COL_DATE_RIG]:
         if c in df.columns:
             df[c] = df[c].fillna('')
-    # Map responsavel alias
-    if COL_RESP_CONCEPT in df.columns:
-        df[COL_RESP_CONCEPT] = df[COL_RESP_CONCEPT].map(normalize_responsavel)
-    if COL_RESP_RIG in df.columns:
-        df[COL_RESP_RIG] = df[COL_RESP_RIG].map(normalize_responsavel)
+    # Map responsavel alias (normaliza só os valores distintos e aplica por dicionário)
+    for c in (COL_RESP_CONCEPT, COL_RESP_RIG):
+        if c in df.columns:
+            tbl = {v: normalize_responsavel(v) for v in df[c].unique()}
+            df[c] = df[c].map(tbl)
+    # Colunas de texto já sem nulos vão para string[pyarrow]: lower/contains/isin/unique
+    # usam os kernels do Arrow e a memória cai em relação ao dtype object
+    text_cols = [c for c in (COL_NAME, COL_FILE_ID, COL_STATUS_CONCEPT, COL_STATUS_RIG, COL_URG_CONCEPT, COL_URG_RIG, COL_RESP_CONCEPT, COL_RESP_RIG) if c in df.columns]
+    df[text_cols] = df[text_cols].astype("string[pyarrow]")
     return df
 
 
+@st.cache_data(ttl=2, show_spinner=False)
 def _dir_signature(img_dir: Path) -> str:
-    """Gera uma assinatura do diretório (nome + mtime + size) para invalidar cache quando mudar."""
+    """Gera uma assinatura do diretório (nome + mtime + size) para invalidar cache quando mudar.
+
+    Usa os.scandir (stat já disponível na entrada) e hash incremental; o TTL curto
+    evita reescanear a pasta em sequências rápidas de reruns.
+    """
     try:
         entries = []
         if img_dir.is_dir():
-            for p in img_dir.iterdir():
-                if p.suffix.lower() in {'.png', '.jpg', '.jpeg', '.webp', '.gif'}:
-                    stt = p.stat()
-                    entries.append(f"{p.name}:{stt.st_mtime_ns}:{stt.st_size}")
+            with os.scandir(img_dir) as it:
+                for e in it:
+                    if os.path.splitext(e.name)[1].lower() in {'.png', '.jpg', '.jpeg', '.webp', '.gif'}:
+                        stt = e.stat(follow_symlinks=False)
+                        entries.append((e.name, stt.st_mtime_ns, stt.st_size))
         entries.sort()
-        return str(hash('|'.join(entries)))
+        h = hashlib.blake2b(digest_size=8)
+        for name, mtime_ns, size in entries:
+            h.update(name.encode('utf-8'))
+            h.update(mtime_ns.to_bytes(8, 'little', signed=True))
+            h.update(size.to_bytes(8, 'little'))
+        return h.hexdigest()
     except Exception:
         return '0'
 
 
-@st.cache_data(show_spinner=False)
-def load_images_index(sig: str) -> dict:
-    """Indexa as imagens da pasta `personagens/`. O parâmetro sig força reindex quando a pasta mudar."""
+@st.cache_resource(show_spinner=False)
+def load_images_index(sig: str) -> ImageIndex:
+    """Indexa as imagens da pasta `personagens/`. O parâmetro sig força reindex quando a pasta mudar.
+
+    Usa cache_resource (objeto compartilhado, sem cópia) para que o memo de
+    find_image_for sobreviva entre reruns enquanto a pasta não mudar.
+    """
     # sig é usado apenas para invalidar o cache quando o diretório muda
     _ = sig
     return index_images(IMG_DIR)
 
 
-@st.cache_data(show_spinner=False)
+@st.cache_resource(max_entries=2048, show_spinner=False)
 def image_to_data_uri(path: str, mtime_ns: int) -> str:
     """Converte um arquivo de imagem local em data URI (base64) para uso no src do <img>.
 
     Isso evita bloqueios de navegador ao tentar carregar caminhos locais (C:/...).
+    cache_resource: a string é imutável, então é compartilhada sem a cópia (pickle)
+    que o cache_data faz a cada acesso; max_entries limita a memória.
     """
     try:
         mime, _ = mimetypes.guess_type(path)
@@ -468,44 +522,134 @@ def image_to_data_uri(path: str, mtime_ns: int) -> str:
             # fallback razoável
             mime = 'image/png'
         with open(path, 'rb') as f:
-            data = base64.b64encode(f.read()).decode('ascii')
+            data = b64encode(f.read()).decode('ascii')
         return f"data:{mime};base64,{data}"
     except Exception:
         return ''
 
 
 @st.cache_data(show_spinner=False)
-def build_base_exp(df: pd.DataFrame, all_eps_tuple: tuple[int, ...]) -> pd.DataFrame:
+def build_base_exp(_df: pd.DataFrame, all_eps_tuple: tuple[int, ...], csv_mtime: int, _img_index: ImageIndex, img_sig: str) -> pd.DataFrame:
     """Pré-processa a base uma vez e cacheia:
     - Converte episódio em lista e replica 'Todos' para todos os numéricos.
-    - Explode em linhas por episódio.
+    - Replica as linhas por episódio (uma linha por par personagem/episódio).
     - Cria colunas normalizadas para busca e flags de conclusão vetorizadas.
+    - Resolve a imagem de cada personagem uma vez (colunas __img_path__ e __img_mtime__).
+
+    Argumentos com '_' não entram no hash do cache; a chave é csv_mtime +
+    episódios + assinatura da pasta de imagens.
     """
-    base = df.copy()
-    base['__EP_LIST__'] = base[COL_EP].map(parse_episode_field)
+    df = _df
+    # Episódios extraídos de uma vez pelo kernel de regex do pandas
+    ep_txt = df[COL_EP].fillna('').astype(str).str.strip()
+    ep_lists = ep_txt.str.findall(_EP_NUM_RE).map(lambda xs: [int(x) for x in xs])
+    is_todos = ep_txt.str.lower().isin(_TODOS)
     all_eps = list(all_eps_tuple)
-    if all_eps:
-        def _expand(lst):
-            if isinstance(lst, list) and any((isinstance(x, str) and str(x).lower() == 'todos') for x in lst):
-                return all_eps
-            return lst
-        base['__EP_LIST__'] = base['__EP_LIST__'].apply(_expand)
-    base = base.explode('__EP_LIST__')
-    base = base[base['__EP_LIST__'].apply(lambda x: isinstance(x, int))]
-    # Normalizações para busca
-    base['__name_norm__'] = base[COL_NAME].astype(str).map(lambda s: ''.join(ch for ch in unidecode(s.lower()) if ch.isalnum()))
-    base['__id_norm__'] = base[COL_FILE_ID].astype(str).map(lambda s: ''.join(ch for ch in unidecode(s.lower()) if ch.isalnum()))
+    if is_todos.any():
+        ep_lists = ep_lists.where(~is_todos, pd.Series([all_eps] * len(df), index=df.index))
+    # Em vez de explode (que copia todas as colunas duas vezes), repete o índice
+    # posicional de cada linha pela quantidade de episódios e seleciona uma vez
+    counts = ep_lists.map(len).to_numpy()
+    rows = np.repeat(np.arange(len(df)), counts)
+    base = df.iloc[rows].copy()
+    base['__EP_LIST__'] = np.fromiter(itertools.chain.from_iterable(ep_lists), dtype=np.int64, count=int(counts.sum()))
+    # Imagem resolvida por personagem (antes da replicação) e espalhada pelas linhas
+    def _img_for(fid, nm) -> str:
+        try:
+            return find_image_for(_img_index, coalesce(fid), coalesce(nm))
+        except Exception:
+            return ''
+    img_paths = np.array([_img_for(f, n) for f, n in zip(df[COL_FILE_ID], df[COL_NAME])], dtype=object)
+    base['__img_path__'] = img_paths[rows]
+    # mtime vem do índice (varredura da pasta), sem os.stat na renderização
+    img_mtimes = np.array([_img_index.mtimes.get(p, 0) for p in img_paths], dtype=np.int64)
+    base['__img_mtime__'] = img_mtimes[rows]
+    # Textos dos cards já limpos e escapados (uma vez por linha do CSV)
+    def _txt(col: str) -> pd.Series:
+        s = df[col] if col in df.columns else pd.Series('', index=df.index)
+        return s.fillna('').astype(str).str.strip()
+    for col, html_col in ((COL_NAME, '__nm_html__'), (COL_FILE_ID, '__fid_html__'),
+                          (COL_RESP_CONCEPT, '__resp_c_html__'), (COL_URG_CONCEPT, '__urg_c_html__'),
+                          (COL_STATUS_CONCEPT, '__sta_c_html__'), (COL_RESP_RIG, '__resp_r_html__'),
+                          (COL_URG_RIG, '__urg_r_html__'), (COL_STATUS_RIG, '__sta_r_html__'),
+                          (COL_COMMENTS, '__comments_html__')):
+        esc = _txt(col).map(html.escape)
+        if html_col not in ('__nm_html__', '__fid_html__'):
+            esc = esc.mask(esc == '', '—')
+        base[html_col] = esc.to_numpy(dtype=object)[rows]
+    # Âncoras dos links prontas (vazias quando não há link)
+    for col, a_col, label in ((COL_RIG_LINK, '__rig_a__', 'Rig'), (COL_CONCEPT_LINK, '__concept_a__', 'Concept'),
+                              (COL_SYNCSKETCH, '__sync_a__', 'SyncSketch')):
+        url = _txt(col)
+        a = "<a href='" + url.map(html.escape) + f"' target='_blank'>{label}</a>"
+        base[a_col] = a.where(url != '', '').to_numpy(dtype=object)[rows]
+    # Estilo das pills de responsável (hash do nome, memoizado por nome)
+    base['__resp_c_style__'] = _txt(COL_RESP_CONCEPT).map(resp_style).to_numpy(dtype=object)[rows]
+    base['__resp_r_style__'] = _txt(COL_RESP_RIG).map(resp_style).to_numpy(dtype=object)[rows]
+    # Normalizações para busca: calculadas nas linhas do CSV e espalhadas pelos episódios
+    # string[pyarrow]: str.contains roda no kernel de substring do Arrow (pyarrow vem com o Streamlit)
+    base['__name_norm__'] = pd.array(search_key_col(df[COL_NAME]).to_numpy()[rows], dtype='string[pyarrow]')
+    base['__id_norm__'] = pd.array(search_key_col(df[COL_FILE_ID]).to_numpy()[rows], dtype='string[pyarrow]')
     # Garantir colunas esperadas para evitar KeyError
     for need in [COL_STATUS_CONCEPT, COL_STATUS_RIG, COL_URG_CONCEPT, COL_URG_RIG, COL_RESP_CONCEPT, COL_RESP_RIG]:
         if need not in base.columns:
             base[need] = ''
-    # Flags concluído (vetorizadas)
-    base['__ok_c__'] = base[COL_STATUS_CONCEPT].map(is_concluido)
-    base['__ok_r__'] = base[COL_STATUS_RIG].map(is_concluido)
+    # Poucos valores distintos repetidos por episódio: Categorical economiza memória
+    # e agiliza comparações/agrupamentos
+    for c in (COL_STATUS_CONCEPT, COL_STATUS_RIG, COL_URG_CONCEPT, COL_URG_RIG, COL_RESP_CONCEPT, COL_RESP_RIG):
+        base[c] = base[c].astype('category')
+    # Versões normalizadas para os filtros da barra lateral (map sobre as categorias)
+    for c, norm_col in ((COL_RESP_CONCEPT, '__resp_c_norm__'), (COL_RESP_RIG, '__resp_r_norm__'),
+                        (COL_STATUS_CONCEPT, '__status_c_norm__'), (COL_STATUS_RIG, '__status_r_norm__'),
+                        (COL_URG_CONCEPT, '__urg_c_norm__'), (COL_URG_RIG, '__urg_r_norm__')):
+        base[norm_col] = base[c].map(normalize_text)
+    # Classes de cor das badges (dict lookup sobre os valores já normalizados)
+    base['__sta_c_cls__'] = base['__status_c_norm__'].map(lambda n: STATUS_CLS.get(n, 'amber'))
+    base['__sta_r_cls__'] = base['__status_r_norm__'].map(lambda n: STATUS_CLS.get(n, 'amber'))
+    base['__urg_c_cls__'] = base['__urg_c_norm__'].map(lambda n: URG_CLS.get(n, 'gray'))
+    base['__urg_r_cls__'] = base['__urg_r_norm__'].map(lambda n: URG_CLS.get(n, 'gray'))
+    # Chaves de ordenação (texto em minúsculas) para as opções de 'Ordenar por'
+    for c, sort_col in SORT_KEY_COLS.items():
+        base[sort_col] = base[c].astype(str).str.lower()
+    # Flags concluído: avalia is_concluido só nas categorias e indexa pelos códigos
+    def _done_flags(col: str) -> np.ndarray:
+        s = base[col]
+        # Último item cobre o código -1 (valor ausente)
+        ok = np.array([is_concluido(v) for v in s.cat.categories] + [False], dtype=bool)
+        return ok[s.cat.codes.to_numpy()]
+    base['__ok_c__'] = _done_flags(COL_STATUS_CONCEPT)
+    base['__ok_r__'] = _done_flags(COL_STATUS_RIG)
     base['__ok_both__'] = base['__ok_c__'] & base['__ok_r__']
     return base
 
 
+@st.cache_data(show_spinner=False, max_entries=64)
+def filter_exp(_base: pd.DataFrame, base_key: tuple, q_norm: str, sel_resps: tuple[str, ...],
+               sel_status: tuple[str, ...], sel_urgs: tuple[str, ...], only_pending: bool) -> pd.DataFrame:
+    """Aplica a busca e os filtros da barra lateral sobre a base expandida.
+
+    Cacheado pela combinação de filtros + base_key (a mesma chave de build_base_exp):
+    reruns que só mudam ordenação ou expanders reaproveitam o resultado.
+    """
+    exp = _base
+    if q_norm:
+        # q_norm só tem [a-z0-9]: busca literal, sem compilar regex
+        exp = exp[(exp['__name_norm__'].str.contains(q_norm, regex=False))
+                  | (exp['__id_norm__'].str.contains(q_norm, regex=False))]
+    if sel_resps:
+        sr_norm = {normalize_text(x) for x in sel_resps}
+        exp = exp[exp['__resp_c_norm__'].isin(sr_norm) | exp['__resp_r_norm__'].isin(sr_norm)]
+    if sel_status:
+        ss_norm = {normalize_text(x) for x in sel_status}
+        exp = exp[exp['__status_c_norm__'].isin(ss_norm) | exp['__status_r_norm__'].isin(ss_norm)]
+    if sel_urgs:
+        su_norm = {normalize_text(x) for x in sel_urgs}
+        exp = exp[exp['__urg_c_norm__'].isin(su_norm) | exp['__urg_r_norm__'].isin(su_norm)]
+    if only_pending:
+        exp = exp[~exp['__ok_both__']]
+    return exp
+
+
 @st.cache_data(show_spinner=False)
 def file_mtime(path: str) -> int:
     """mtime do arquivo (ns), cacheado para evitar muitos os.stat."""
@@ -515,33 +659,118 @@ def file_mtime(path: str) -> int:
         return 0
 
 
+def _thumb_cache_file(path: str, size: int, cover: bool, mtime_ns: int) -> Path:
+    """Caminho da miniatura em disco; o mtime da origem no nome invalida versões antigas."""
+    digest = hashlib.sha1(path.encode('utf-8')).hexdigest()
+    return THUMB_CACHE_DIR / f"{digest}_{size}_{int(cover)}_{mtime_ns}.webp"
+
+
+def _render_thumbnail(path: str, size: int, cover: bool) -> bytes:
+    """Redimensiona a imagem com PIL e retorna os bytes WebP da miniatura."""
+    from PIL import Image, ImageOps  # type: ignore
+    with Image.open(path) as im:
+        # JPEG: decodifica já em escala reduzida (sem efeito para outros formatos)
+        im.draft('RGB', (size * 2, size * 2))
+        # Demais formatos: reduz por fator inteiro (box) mantendo ao menos 2x o alvo
+        # antes do LANCZOS, que fica bem mais barato em artes grandes
+        r = min(im.width, im.height) // (size * 2)
+        # Fontes opacas no modo cover ficam em RGB (3 canais); o canvas transparente
+        # e imagens com alpha precisam de RGBA. reduce não aceita modo 'P' (paleta)
+        has_alpha = im.mode in ('RGBA', 'LA', 'PA') or 'transparency' in im.info
+        im = im.convert('RGBA' if (has_alpha or not cover) else 'RGB')
+        if r > 1:
+            im = im.reduce(r)
+        if cover:
+            thumb = ImageOps.fit(im, (size, size), method=Image.LANCZOS)
+        else:
+            im.thumbnail((size, size), Image.LANCZOS)
+            if im.size == (size, size):
+                thumb = im  # já é quadrada: dispensa o canvas
+            else:
+                thumb = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+                off = ((size - im.width) // 2, (size - im.height) // 2)
+                thumb.paste(im, off)
+    buf = io.BytesIO()
+    # WebP com perdas (bem menor que PNG no payload); o canvas transparente pede qualidade maior
+    thumb.save(buf, format='WEBP', quality=80 if cover else 85, method=4)
+    return buf.getvalue()
+
+
 @st.cache_data(show_spinner=False)
 def thumbnail_data_uri(path: str, size: int, cover: bool, mtime_ns: int) -> str:
-    """Gera uma miniatura quadrada PNG como data URI, cacheada por caminho+size+cover+mtime.
+    """Gera uma miniatura quadrada WebP como data URI, cacheada por caminho+size+cover+mtime.
 
     - cover=True: recorta preenchendo (ImageOps.fit)
     - cover=False: mantém proporção e centraliza em canvas quadrado transparente
+
+    Além do cache em memória, as miniaturas ficam em `.cache/thumbs/` e sobrevivem
+    a reinícios do servidor; o PIL só é usado quando o arquivo ainda não existe.
     """
     try:
-        from PIL import Image, ImageOps  # type: ignore
-        mime = 'image/png'
-        with Image.open(path) as im:
-            im = im.convert('RGBA')
-            if cover:
-                thumb = ImageOps.fit(im, (size, size), method=Image.LANCZOS)
-            else:
-                im.thumbnail((size, size), Image.LANCZOS)
-                thumb = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-                off = ((size - im.width) // 2, (size - im.height) // 2)
-                thumb.paste(im, off)
-        buf = io.BytesIO()
-        thumb.save(buf, format='PNG', optimize=True)
-        data = base64.b64encode(buf.getvalue()).decode('ascii')
-        return f"data:{mime};base64,{data}"
+        mime = 'image/webp'
+        cache_file = _thumb_cache_file(path, size, cover, mtime_ns)
+        try:
+            data = cache_file.read_bytes()
+        except OSError:
+            data = _render_thumbnail(path, size, cover)
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                # Remove versões antigas (mtime diferente) da mesma miniatura
+                for old in cache_file.parent.glob(cache_file.name.rsplit('_', 1)[0] + '_*'):
+                    old.unlink(missing_ok=True)
+                tmp = cache_file.with_suffix('.tmp')
+                tmp.write_bytes(data)
+                os.replace(tmp, cache_file)
+            except OSError:
+                pass  # Disco somente leitura: segue apenas com o cache em memória
+        return f"data:{mime};base64,{b64encode(data).decode('ascii')}"
     except Exception:
         return ''
 
 
+_BLANK_LINES_RE = re.compile(r"\n[ \t]*(?=\n)")
+
+
+def _render_cards_html(bloco: pd.DataFrame, thumb_w: int, img_cover: bool,
+                       card_pad: int, compact: bool, hide_images: bool) -> list[str]:
+    """Monta o HTML dos cards de um episódio (miniatura, links, badges e comentário).
+
+    Concatenação vetorizada sobre as colunas pré-computadas em build_base_exp
+    (textos escapados, âncoras, classes e estilos): sem f-string por linha.
+    O data URI é resolvido uma vez por imagem distinta (cache próprio por mtime).
+    """
+    def col(c: str) -> np.ndarray:
+        return bloco[c].to_numpy(dtype=object)
+
+    left_img = ''
+    if not hide_images:
+        # Usa data URI para imagens locais; cacheado por mtime
+        srcs = {}
+        for path, mt in zip(col('__img_path__'), col('__img_mtime__')):
+            if path not in srcs:
+                srcs[path] = (image_to_data_uri(path, int(mt)) if path
+                              else 'https://via.placeholder.com/192x192.png?text=Sem+Imagem')
+        cover_cls = ' cover' if img_cover else ''
+        left_img = ("<img src='" + np.array([srcs[p] for p in col('__img_path__')], dtype=object)
+                    + f"' class='svb-thumb{cover_cls}' width='{thumb_w}' height='{thumb_w}'>")
+    # Padding do conteúdo do card: respeita modo compacto
+    pad = f"{card_pad}px" if not compact else f"{min(card_pad, 10)}px"
+    done_cls = np.where(bloco['__ok_both__'].to_numpy(dtype=bool), 'done', '').astype(object)
+    cards = ("<div class='svb-card " + done_cls + "'><div class='svb-row'>" + left_img
+             + f"<div style='flex:1 1 auto;padding:{pad};'>"
+             + "<div class='svb-title'>" + col('__nm_html__') + " <code>" + col('__fid_html__') + "</code></div>"
+             + "<div class='svb-links'>" + col('__rig_a__') + " " + col('__concept_a__') + " " + col('__sync_a__') + "</div>"
+             + "<div class='svb-grid' style='margin-top:6px;'>"
+             + "<div><span class='svb-label'>Concept</span> <span class='svb-pill' style='" + col('__resp_c_style__') + "'>" + col('__resp_c_html__') + "</span></div>"
+             + "<div><span class='svb-badge " + col('__urg_c_cls__') + "'>" + col('__urg_c_html__') + "</span> <span class='svb-badge " + col('__sta_c_cls__') + "'>" + col('__sta_c_html__') + "</span></div>"
+             + "<div><span class='svb-label'>Rig</span> <span class='svb-pill' style='" + col('__resp_r_style__') + "'>" + col('__resp_r_html__') + "</span></div>"
+             + "<div><span class='svb-badge " + col('__urg_r_cls__') + "'>" + col('__urg_r_html__') + "</span> <span class='svb-badge " + col('__sta_r_cls__') + "'>" + col('__sta_r_html__') + "</span></div>"
+             + "</div>"
+             + "<div class='svb-comment'>" + col('__comments_html__') + "</div>"
+             + "</div></div></div>")
+    return cards.tolist()
+
+
 # ----------------- UI -----------------
 
 st.set_page_config(page_title='Produção por Episódio', layout='wide')
@@ -591,6 +820,9 @@ st.markdown(
     .svb-label { font-size:13px; color:#374151; font-weight:600; margin-right:8px; }
     .svb-comment { font-size:13px; color:#4b5563; border-top:1px solid #e5e7eb; padding-top:8px; margin-top:8px; font-style:italic; }
     .svb-metrics { color:inherit; opacity:0.85; font-size:13px; }
+    .svb-table { width:100%; border-collapse:collapse; font-size:13px; }
+    .svb-table th, .svb-table td { border:1px solid #e2e8f0; padding:4px 8px; text-align:left; vertical-align:top; }
+    .svb-table th { background:rgba(0,0,0,0.04); font-weight:600; }
     </style>
     """,
     unsafe_allow_html=True,
@@ -650,19 +882,15 @@ if _logo:
 
 st.title('Produção por Episódio')
 
-# Query params: controlar expandir/recolher tudo via URL (?expand=1|0)
-params = st.query_params if hasattr(st, 'query_params') else {}
-expand_all_from_qs = None
-try:
-    val = params.get('expand') if isinstance(params, dict) else None
-    if isinstance(val, list):
-        val = val[0] if val else None
+# Query params: estado inicial de expandir/recolher tudo via URL (?expand=1|0).
+# Lido só no primeiro carregamento da sessão; depois vale o session_state (botões)
+if '__expand_all__' not in st.session_state:
+    try:
+        val = st.query_params.get('expand')
+    except Exception:
+        val = None
     if val is not None:
-        expand_all_from_qs = str(val) in ('1', 'true', 'True')
-except Exception:
-    pass
-if expand_all_from_qs is not None:
-    st.session_state['__expand_all__'] = expand_all_from_qs
+        st.session_state['__expand_all__'] = str(val) in ('1', 'true', 'True')
 
 if not CSV_PATH.exists():
     # Falha rápida caso o CSV não esteja presente na pasta do projeto
@@ -687,23 +915,22 @@ all_eps = detect_all_numeric_episodes(df)  # Lista de episódios distintos para
 
 # Unique values for filters
 # Obtemos valores únicos para popular os multiselects de responsáveis, status e urgências
-resps = sorted({v for v in pd.concat([
-    df.get(COL_RESP_CONCEPT, pd.Series(dtype=str)),
-    df.get(COL_RESP_RIG, pd.Series(dtype=str))
-], ignore_index=True).dropna().unique().tolist()}, key=lambda s: _normalize_text(str(s)))
-statuses = sorted({v for v in pd.concat([
-    df.get(COL_STATUS_CONCEPT, pd.Series(dtype=str)),
-    df.get(COL_STATUS_RIG, pd.Series(dtype=str))
-], ignore_index=True).dropna().unique().tolist()}, key=lambda s: _normalize_text(str(s)))
+def _unique_union(*cols: str) -> set:
+    """União dos valores distintos das colunas (sem concatenar as séries)."""
+    out = set()
+    for c in cols:
+        if c in df.columns:
+            out.update(df[c].dropna().unique().tolist())
+    return out
+
+resps = sorted(_unique_union(COL_RESP_CONCEPT, COL_RESP_RIG), key=lambda s: normalize_text(str(s)))
+statuses = sorted(_unique_union(COL_STATUS_CONCEPT, COL_STATUS_RIG), key=lambda s: normalize_text(str(s)))
 
 # urgency order
-urgs_raw = {v for v in pd.concat([
-    df.get(COL_URG_CONCEPT, pd.Series(dtype=str)),
-    df.get(COL_URG_RIG, pd.Series(dtype=str))
-], ignore_index=True).dropna().unique().tolist()}
+urgs_raw = _unique_union(COL_URG_CONCEPT, COL_URG_RIG)
 
 def _urg_key(u: str):
-    nu = _normalize_text(str(u))
+    nu = normalize_text(str(u))
     if nu == 'alta':
         return (0, nu)
     if nu == 'media':
@@ -745,6 +972,8 @@ layout_mode = st.sidebar.radio('Layout', ['Cards', 'Tabela'], index=0)
 if st.sidebar.button('Recarregar imagens', help='Reindexar a pasta personagens e atualizar miniaturas'):
     try:
         st.cache_data.clear()
+        load_images_index.clear()
+        image_to_data_uri.clear()
     except Exception:
         pass
     try:
@@ -765,7 +994,7 @@ if auto_refresh:
 if not hide_images:
     if not IMG_DIR.exists():
         st.info("Pasta de imagens 'personagens' não encontrada ao lado do app.")
-    elif len(img_index) == 0:
+    elif not img_index.exact:
         st.info("Nenhuma imagem encontrada em 'personagens'.")
 
 # Dynamic CSS from controls
@@ -787,35 +1016,84 @@ if not show_all:
     selected_ep = st.sidebar.selectbox('Episódio', options=all_eps, index=0 if all_eps else None)
 
 # Explode episodes for grouping — versão cacheada e pré-processada
-base_exp = build_base_exp(df, tuple(all_eps))
-exp = base_exp.copy()
+csv_mtime = file_mtime(str(CSV_PATH))
+base_exp = build_base_exp(df, tuple(all_eps), csv_mtime, img_index, _sig_images)
+base_key = (csv_mtime, tuple(all_eps), _sig_images)
 
 # Filters apply
-# Aplicamos busca e filtros de forma cumulativa usando funções auxiliares
-q_norm = ''.join(ch for ch in unidecode((q or '').lower()) if ch.isalnum())
-if q_norm:
-    exp = exp[(exp['__name_norm__'].str.contains(q_norm)) | (exp['__id_norm__'].str.contains(q_norm))]
-
-if sel_resps:
-    sr_norm = {_normalize_text(x) for x in sel_resps}
-    def _resp_match(row):
-        return (_normalize_text(row.get(COL_RESP_CONCEPT,'')) in sr_norm) or (_normalize_text(row.get(COL_RESP_RIG,'')) in sr_norm)
-    exp = exp[exp.apply(_resp_match, axis=1)]
-
-if sel_status:
-    ss_norm = {_normalize_text(x) for x in sel_status}
-    def _status_match(row):
-        return (_normalize_text(row.get(COL_STATUS_CONCEPT,'')) in ss_norm) or (_normalize_text(row.get(COL_STATUS_RIG,'')) in ss_norm)
-    exp = exp[exp.apply(_status_match, axis=1)]
-
-if sel_urgs:
-    su_norm = {_normalize_text(x) for x in sel_urgs}
-    def _urg_match(row):
-        return (_normalize_text(row.get(COL_URG_CONCEPT,'')) in su_norm) or (_normalize_text(row.get(COL_URG_RIG,'')) in su_norm)
-    exp = exp[exp.apply(_urg_match, axis=1)]
-
-if only_pending:
-    exp = exp[~exp['__ok_both__']]
+# Busca e filtros cumulativos sobre as colunas normalizadas da base (resultado cacheado)
+q_norm = search_key(q or '')
+exp = filter_exp(base_exp, base_key, q_norm, tuple(sel_resps), tuple(sel_status), tuple(sel_urgs), only_pending)
+exp_key = (base_key, q_norm, tuple(sel_resps), tuple(sel_status), tuple(sel_urgs), only_pending)
+
+# st.fragment (Streamlit >= 1.37; antes experimental_fragment): interações dentro do
+# episódio (ex.: 'Ordenar por') reexecutam só o bloco dele, não o app inteiro
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda f: f)
+
+
+@_fragment
+def _render_episode(ep: int, ep_rows: np.ndarray, expanded: bool):
+    """Renderiza o expander de um episódio (métricas, ordenação e cards/tabela).
+
+    ep_rows: posições das linhas do episódio em `exp` (agrupadas uma vez por rerun).
+    expanded: estado de 'Expandir/Recolher tudo', lido uma vez em render_dashboard.
+    """
+    bloco = exp.iloc[ep_rows]
+    total_ep = len(bloco)
+    concept_done = int(np.count_nonzero(bloco['__ok_c__'].to_numpy()))
+    rig_done = int(np.count_nonzero(bloco['__ok_r__'].to_numpy()))
+    both_done = int(np.count_nonzero(bloco['__ok_both__'].to_numpy()))
+
+    # Âncora única por episódio (antes do expander) para evitar IDs duplicados
+    st.markdown(f"<div id='episodio-{ep}'></div>", unsafe_allow_html=True)
+    with st.expander(f"Episódio {ep} — {total_ep} ", expanded=expanded):
+        st.markdown(f"<span class='svb-metrics'>Concept: <b>{concept_done}</b>/{total_ep} • Rig: <b>{rig_done}</b>/{total_ep} • Ambos: <b>{both_done}</b>/{total_ep}</span>", unsafe_allow_html=True)
+        # Sort options
+        # O usuário escolhe a ordenação do bloco atual (nome, ID, urgências, status, responsáveis)
+        sort_key = st.selectbox(
+            'Ordenar por',
+            options=['Nome','ID','Urgência Concept','Urgência Rig','Status Concept','Status Rig','Resp. Concept','Resp. Rig'],
+            key=f'sort_ep_{ep}',
+            index=0
+        )
+        sort_map = {
+            'Nome': COL_NAME,
+            'ID': COL_FILE_ID,
+            'Urgência Concept': COL_URG_CONCEPT,
+            'Urgência Rig': COL_URG_RIG,
+            'Status Concept': COL_STATUS_CONCEPT,
+            'Status Rig': COL_STATUS_RIG,
+            'Resp. Concept': COL_RESP_CONCEPT,
+            'Resp. Rig': COL_RESP_RIG,
+        }
+        # Ordena pela chave em minúsculas já calculada em build_base_exp
+        bloco = bloco.sort_values(by=SORT_KEY_COLS[sort_map.get(sort_key, COL_NAME)])
+
+        if layout_mode == 'Tabela':
+            # Visualização compacta em tabela
+            view = bloco[[COL_NAME, COL_FILE_ID, COL_RESP_CONCEPT, COL_URG_CONCEPT, COL_STATUS_CONCEPT, COL_RESP_RIG, COL_URG_RIG, COL_STATUS_RIG, COL_COMMENTS]].copy()
+            view.rename(columns={
+                COL_NAME:'Nome', COL_FILE_ID:'ID', COL_RESP_CONCEPT:'Resp Concept', COL_URG_CONCEPT:'Urg Concept', COL_STATUS_CONCEPT:'Status Concept',
+                COL_RESP_RIG:'Resp Rig', COL_URG_RIG:'Urg Rig', COL_STATUS_RIG:'Status Rig', COL_COMMENTS:'Comentários'
+            }, inplace=True)
+            view['Concluído'] = bloco['__ok_both__']
+            if len(view) <= HTML_TABLE_MAX_ROWS:
+                # Tabela HTML estática: sem o componente de grade (Arrow) a cada rerun
+                view['Concluído'] = np.where(view['Concluído'], '✅', '')
+                # to_html exibiria quebras de linha como '\n' literal
+                view['Comentários'] = view['Comentários'].str.replace(r'\s*\n\s*', ' ', regex=True)
+                st.markdown(view.to_html(index=False, escape=True, na_rep='', border=0, classes='svb-table'),
+                            unsafe_allow_html=True)
+            else:
+                st.dataframe(view, use_container_width=True, hide_index=True)
+        else:
+            # Render cards (layout visual com miniatura e badges/pills)
+            cards_html = _render_cards_html(bloco, thumb_w, img_cover, card_pad, compact, hide_images)
+            # Um único st.markdown por episódio (uma mensagem ao front em vez de uma por card).
+            # Linhas em branco encerrariam o bloco HTML do markdown, então são removidas.
+            if cards_html:
+                st.markdown(_BLANK_LINES_RE.sub('', '\n'.join(cards_html)), unsafe_allow_html=True)
+
 
 def render_dashboard():
     """Renderiza a aba principal de produção por episódio (chips + expanders)."""
@@ -831,170 +1109,64 @@ def render_dashboard():
     st.markdown('<div class="svb-ep-links">' + ' '.join([f"<a href='#episodio-{ep}'>Ep {ep}</a>" for ep in eps_to_show]) + '</div>', unsafe_allow_html=True)
 
     # Expandir/Recolher tudo
-    # Botões (não abrem nova aba). Mantidos abaixo da barra sticky
+    # Botões (não abrem nova aba). Mantidos abaixo da barra sticky; o clique já gera
+    # um rerun e o estado é gravado antes dos expanders serem criados, sem st.rerun()
     cexp1, cexp2, _ = st.columns([0.15, 0.18, 0.67])
     with cexp1:
         if st.button('Expandir tudo', key='expand_all_btn'):
             st.session_state['__expand_all__'] = True
-            try:
-                st.query_params['expand'] = '1'
-            except Exception:
-                pass
-            try:
-                st.rerun()
-            except Exception:
-                st.experimental_rerun()
     with cexp2:
         if st.button('Recolher tudo', key='collapse_all_btn'):
             st.session_state['__expand_all__'] = False
-            try:
-                st.query_params['expand'] = '0'
-            except Exception:
-                pass
-            try:
-                st.rerun()
-            except Exception:
-                st.experimental_rerun()
 
+    # Um único agrupamento (hash) em vez de uma máscara sobre `exp` por episódio
+    ep_indices = exp.groupby('__EP_LIST__', sort=False).indices
+    no_rows = np.empty(0, dtype=np.intp)
+    expand_all = bool(st.session_state.get('__expand_all__', False))
     for ep in eps_to_show:
-        bloco = exp[exp['__EP_LIST__'] == ep].copy()
-        total_ep = len(bloco)
-        concept_done = int((bloco[COL_STATUS_CONCEPT].map(is_concluido)).sum())
-        rig_done = int((bloco[COL_STATUS_RIG].map(is_concluido)).sum())
-        both_done = int(((bloco[COL_STATUS_CONCEPT].map(is_concluido)) & (bloco[COL_STATUS_RIG].map(is_concluido))).sum())
-
-        # Âncora única por episódio (antes do expander) para evitar IDs duplicados
-        st.markdown(f"<div id='episodio-{ep}'></div>", unsafe_allow_html=True)
-        with st.expander(f"Episódio {ep} — {total_ep} ", expanded=st.session_state.get('__expand_all__', False)):
-            st.markdown(f"<span class='svb-metrics'>Concept: <b>{concept_done}</b>/{total_ep} • Rig: <b>{rig_done}</b>/{total_ep} • Ambos: <b>{both_done}</b>/{total_ep}</span>", unsafe_allow_html=True)
-            # Sort options
-            # O usuário escolhe a ordenação do bloco atual (nome, ID, urgências, status, responsáveis)
-            sort_key = st.selectbox(
-                'Ordenar por',
-                options=['Nome','ID','Urgência Concept','Urgência Rig','Status Concept','Status Rig','Resp. Concept','Resp. Rig'],
-                key=f'sort_ep_{ep}',
-                index=0
-            )
-            sort_map = {
-                'Nome': COL_NAME,
-                'ID': COL_FILE_ID,
-                'Urgência Concept': COL_URG_CONCEPT,
-                'Urgência Rig': COL_URG_RIG,
-                'Status Concept': COL_STATUS_CONCEPT,
-                'Status Rig': COL_STATUS_RIG,
-                'Resp. Concept': COL_RESP_CONCEPT,
-                'Resp. Rig': COL_RESP_RIG,
-            }
-            bloco.sort_values(by=sort_map.get(sort_key, COL_NAME), inplace=True, key=lambda s: s.astype(str).str.lower())
-
-            if layout_mode == 'Tabela':
-                # Visualização compacta em DataFrame
-                view = bloco[[COL_NAME, COL_FILE_ID, COL_RESP_CONCEPT, COL_URG_CONCEPT, COL_STATUS_CONCEPT, COL_RESP_RIG, COL_URG_RIG, COL_STATUS_RIG, COL_COMMENTS]].copy()
-                view.rename(columns={
-                    COL_NAME:'Nome', COL_FILE_ID:'ID', COL_RESP_CONCEPT:'Resp Concept', COL_URG_CONCEPT:'Urg Concept', COL_STATUS_CONCEPT:'Status Concept',
-                    COL_RESP_RIG:'Resp Rig', COL_URG_RIG:'Urg Rig', COL_STATUS_RIG:'Status Rig', COL_COMMENTS:'Comentários'
-                }, inplace=True)
-                view['Concluído'] = (view['Status Concept'].map(is_concluido)) & (view['Status Rig'].map(is_concluido))
-                st.dataframe(view, use_container_width=True, hide_index=True)
-            else:
-                # Render cards (layout visual com miniatura e badges/pills)
-                for _, r in bloco.iterrows():
-                    nm = coalesce(r.get(COL_NAME))
-                    fid = coalesce(r.get(COL_FILE_ID))
-                    rig_link = coalesce(r.get(COL_RIG_LINK))
-                    concept_link = coalesce(r.get(COL_CONCEPT_LINK))
-                    sync_link = coalesce(r.get(COL_SYNCSKETCH))
-                    resp_c = coalesce(r.get(COL_RESP_CONCEPT))
-                    urg_c = coalesce(r.get(COL_URG_CONCEPT))
-                    sta_c = coalesce(r.get(COL_STATUS_CONCEPT))
-                    resp_r = coalesce(r.get(COL_RESP_RIG))
-                    urg_r = coalesce(r.get(COL_URG_RIG))
-                    sta_r = coalesce(r.get(COL_STATUS_RIG))
-                    comments = coalesce(r.get(COL_COMMENTS))
-
-                    # Image resolve — tenta casar por ID e nome com o índice gerado da pasta `personagens`
-                    img_path = ''
-                    try:
-                        img_path = find_image_for(img_index, fid, nm)
-                    except Exception:
-                        img_path = ''
-
-                    ok_both = is_concluido(sta_c) and is_concluido(sta_r)
-                    done_cls = 'done' if ok_both else ''
-                    # Classes for status — definem as cores das badges de Status/Urgência
-                    def _status_cls(s):
-                        n = _normalize_text(s)
-                        if n == 'concluido': return 'green'
-                        if n in ('em andamento','fazendo','andamento'): return 'blue'
-                        if n in ('a fazer','pendente','todo'): return 'gray'
-                        if n in ('bloqueado','impedido'): return 'red'
-                        return 'amber'
-                    def _urg_cls(u):
-                        n = _normalize_text(u)
-                        if n == 'alta': return 'red'
-                        if n == 'media': return 'amber'
-                        if n == 'baixa': return 'green'
-                        return 'gray'
-                    # Color for responsible pill via simple hash hue — cria um tom por responsável
-                    def _resp_style(name: str):
-                        s = norm_key(name or '')
-                        h = 0
-                        for ch in s:
-                            h = (h*31 + ord(ch)) & 0xFFFFFFFF
-                        hue = h % 360
-                        return f"background:hsl({hue},70%,92%);border-color:#d0d7de;"
-
-                    # Build HTML card — HTML inline para maior controle visual (imagens, badges, grid)
-                    left_img = ''
-                    if not hide_images:
-                        # Usa data URI para imagens locais; cacheado por mtime
-                        if img_path:
-                            try:
-                                mt = os.stat(img_path).st_mtime_ns
-                            except Exception:
-                                mt = 0
-                            src = image_to_data_uri(img_path, mt)
-                        else:
-                            src = 'https://via.placeholder.com/192x192.png?text=Sem+Imagem'
-                        cover_cls = ' cover' if img_cover else ''
-                        left_img = f"<img src='{src}' class='svb-thumb{cover_cls}' width='{thumb_w}' height='{thumb_w}'>"
-                    # Padding do conteúdo do card: respeita modo compacto
-                    pad = f"{card_pad}px" if not compact else f"{min(card_pad, 10)}px"
-                    html_card = f"""
-                    <div class='svb-card {done_cls}'>
-                        <div class='svb-row'>
-                            {left_img}
-                            <div style='flex:1 1 auto;padding:{pad};'>
-                                <div class='svb-title'>{nm} <code>{fid}</code></div>
-                                <div class='svb-links'>
-                                    {f"<a href='{rig_link}' target='_blank'>Rig</a>" if rig_link else ''}
-                                    {f"<a href='{concept_link}' target='_blank'>Concept</a>" if concept_link else ''}
-                                    {f"<a href='{sync_link}' target='_blank'>SyncSketch</a>" if sync_link else ''}
-                                </div>
-                                <div class='svb-grid' style='margin-top:6px;'>
-                                    <div><span class='svb-label'>Concept</span> <span class='svb-pill' style='{_resp_style(resp_c)}'>{resp_c or '—'}</span></div>
-                                    <div><span class='svb-badge {_urg_cls(urg_c)}'>{urg_c or '—'}</span> <span class='svb-badge {_status_cls(sta_c)}'>{sta_c or '—'}</span></div>
-                                    <div><span class='svb-label'>Rig</span> <span class='svb-pill' style='{_resp_style(resp_r)}'>{resp_r or '—'}</span></div>
-                                    <div><span class='svb-badge {_urg_cls(urg_r)}'>{urg_r or '—'}</span> <span class='svb-badge {_status_cls(sta_r)}'>{sta_r or '—'}</span></div>
-                                </div>
-                                <div class='svb-comment'>{comments or '—'}</div>
-                            </div>
-                        </div>
-                    </div>
-                    """
-                    st.markdown(html_card, unsafe_allow_html=True)
+        _render_episode(ep, ep_indices.get(ep, no_rows), expand_all)
 
     st.caption('UI em Streamlit — filtros reativos, colapsáveis por episódio, ordenação, e destaque visual para concluídos, urgência e responsáveis.')
 
+@st.cache_data(show_spinner=False)
+def compute_stats(_df: pd.DataFrame, csv_mtime: int) -> dict:
+    """Tabelas da aba Estatísticas que dependem só do CSV (cacheadas pelo mtime)."""
+    return summary_stats(_df, COL_STATUS_CONCEPT, COL_STATUS_RIG, COL_URG_CONCEPT, COL_URG_RIG,
+                         COL_RESP_CONCEPT, COL_RESP_RIG, is_concluido, top=10,
+                         id_col=COL_FILE_ID, name_col=COL_NAME)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_episode_completion(_exp: pd.DataFrame, exp_key: tuple) -> pd.DataFrame:
+    """Conclusão por episódio sobre a base filtrada; exp_key identifica base + filtros."""
+    return episode_completion(_exp, COL_STATUS_CONCEPT, COL_STATUS_RIG, is_concluido, id_col=COL_FILE_ID, name_col=COL_NAME)
+
+
+@st.cache_data(show_spinner=False)
+def donut_spec(df_src: pd.DataFrame, label_col: str, title: str):
+    """Spec Vega-Lite (dict) do gráfico de rosca; None quando não há dados.
+
+    O altair só é importado quando o spec precisa ser (re)construído.
+    """
+    if df_src.empty:
+        return None
+    import altair as alt  # import tardio para reduzir tempo de carregamento inicial
+    df_plot = df_src[df_src['count'] > 0]
+    return alt.Chart(df_plot).mark_arc(innerRadius=60, outerRadius=100).encode(
+        theta=alt.Theta(field='count', type='quantitative'),
+        color=alt.Color(field=label_col, type='nominal', legend=alt.Legend(title=label_col))
+    ).properties(width=280, height=220, title=title).to_dict()
+
+
 # Abas: Dashboard, Estatísticas, Histórico, Lista
 tab_main, tab_stats, tab_hist, tab_list = st.tabs(['Dashboard', 'Estatísticas', 'Histórico', 'Lista'])
 with tab_main:
     render_dashboard()
 
 with tab_stats:
-    import altair as alt  # import tardio para reduzir tempo de carregamento inicial
     st.subheader('Visão geral')
-    ov = overall_stats(df, COL_STATUS_CONCEPT, COL_STATUS_RIG, is_concluido, id_col=COL_FILE_ID, name_col=COL_NAME)
+    stats = compute_stats(df, csv_mtime)
+    ov = stats['overall']
     c1, c2, c3, c4 = st.columns(4)
     c1.metric('Personagens', ov['total'])
     c2.metric('Concept concluído', ov['concept_done'], f"{ov['concept_pct']:.0f}%")
@@ -1003,34 +1175,24 @@ with tab_stats:
 
     st.divider()
     st.subheader('Conclusão por episódio')
-    ep_df = episode_completion(exp, COL_STATUS_CONCEPT, COL_STATUS_RIG, is_concluido, id_col=COL_FILE_ID, name_col=COL_NAME)
+    ep_df = compute_episode_completion(exp, exp_key)
     st.dataframe(ep_df, use_container_width=True, hide_index=True)
     st.bar_chart(ep_df.set_index('Episódio')['% Ambos'])
 
     st.divider()
     st.subheader('Distribuição de Status')
     st.caption('Separado por etapa (Concept / Rig)')
-    s_conc, s_rig = status_breakdown(df, COL_STATUS_CONCEPT, COL_STATUS_RIG, id_col=COL_FILE_ID, name_col=COL_NAME)
+    s_conc, s_rig = stats['status']
     cc, cr = st.columns(2)
     # Donut charts for status
-    def donut_chart(df_src, label_col, title):
-        df_plot = df_src.copy()
-        if df_plot.empty:
-            return None
-        df_plot = df_plot[df_plot['count'] > 0]
-        return alt.Chart(df_plot).mark_arc(innerRadius=60, outerRadius=100).encode(
-            theta=alt.Theta(field='count', type='quantitative'),
-            color=alt.Color(field=label_col, type='nominal', legend=alt.Legend(title=label_col))
-        ).properties(width=280, height=220, title=title)
-
-    ch1 = donut_chart(s_conc, COL_STATUS_CONCEPT, 'Status — Concept')
-    ch2 = donut_chart(s_rig, COL_STATUS_RIG, 'Status — Rig')
+    ch1 = donut_spec(s_conc, COL_STATUS_CONCEPT, 'Status — Concept')
+    ch2 = donut_spec(s_rig, COL_STATUS_RIG, 'Status — Rig')
     if ch1 is not None:
-        cc.altair_chart(ch1, use_container_width=True)
+        cc.vega_lite_chart(ch1, use_container_width=True)
     else:
         cc.info('Sem dados de Status (Concept)')
     if ch2 is not None:
-        cr.altair_chart(ch2, use_container_width=True)
+        cr.vega_lite_chart(ch2, use_container_width=True)
     else:
         cr.info('Sem dados de Status (Rig)')
     # Optional: tables below
@@ -1041,17 +1203,17 @@ with tab_stats:
 
     st.divider()
     st.subheader('Urgência')
-    u_conc, u_rig = urgency_breakdown(df, COL_URG_CONCEPT, COL_URG_RIG, id_col=COL_FILE_ID, name_col=COL_NAME)
+    u_conc, u_rig = stats['urgency']
     uc, ur = st.columns(2)
     # Donut charts for urgency
-    ch3 = donut_chart(u_conc, COL_URG_CONCEPT, 'Urgência — Concept')
-    ch4 = donut_chart(u_rig, COL_URG_RIG, 'Urgência — Rig')
+    ch3 = donut_spec(u_conc, COL_URG_CONCEPT, 'Urgência — Concept')
+    ch4 = donut_spec(u_rig, COL_URG_RIG, 'Urgência — Rig')
     if ch3 is not None:
-        uc.altair_chart(ch3, use_container_width=True)
+        uc.vega_lite_chart(ch3, use_container_width=True)
     else:
         uc.info('Sem dados de Urgência (Concept)')
     if ch4 is not None:
-        ur.altair_chart(ch4, use_container_width=True)
+        ur.vega_lite_chart(ch4, use_container_width=True)
     else:
         ur.info('Sem dados de Urgência (Rig)')
     st.caption('Tabelas')
@@ -1061,7 +1223,7 @@ with tab_stats:
 
     st.divider()
     st.subheader('Responsáveis (Top 10)')
-    r_conc, r_rig = responsavel_breakdown(df, COL_RESP_CONCEPT, COL_RESP_RIG, top=10, id_col=COL_FILE_ID, name_col=COL_NAME)
+    r_conc, r_rig = stats['responsaveis']
     rc, rr = st.columns(2)
     rc.dataframe(r_conc, use_container_width=True)
     rr.dataframe(r_rig, use_container_width=True)
@@ -1073,6 +1235,7 @@ with tab_stats:
             path = find_image_for(img_index, fid, name)
             if not path:
                 return ''
-            mt = file_mtime(path)
+            mt = img_index.mtimes.get(path, 0)
             return thumbnail_data_uri(path, size=size, cover=True, mtime_ns=mt)
-        render_list_tab(df, get_thumb=_thumb_for)
+        render_list_tab(df, get_thumb=_thumb_for,
+                        has_thumb_id=functools.partial(has_image_for_id, img_index))
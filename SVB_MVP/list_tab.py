@@ -7,8 +7,11 @@ from __future__ import annotations
 import re
 import io
 import base64
+import functools
+import hashlib
 from typing import List, Tuple, Callable, Optional
 import textwrap
+import numpy as np
 import pandas as pd
 import streamlit as st
 
@@ -40,10 +43,6 @@ except ImportError:
             text = text.replace(accented, unaccented)
         return text
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from PIL import Image, ImageDraw, ImageFont
-
 # Nomes de colunas (iguais aos usados em app.py / timeline.py)
 COL_EP = 'Episódio'
 COL_NAME = 'Nome do perosnagem'
@@ -57,230 +56,309 @@ COL_RESP_CONCEPT = 'Responsável'
 COL_RESP_RIG = 'Respondável'
 COL_COMMENTS = 'COMENTÁRIOS'
 
-
+# Cabeçalhos aceitos por build_open_tasks, em ordem de preferência. O app.py monta a lista
+# de colunas lidas do CSV a partir daqui, então um alias novo não é descartado na leitura
+OPEN_TASK_COLUMN_ALIASES = {
+    'ep': (COL_EP, 'EPS', 'Episódio', 'Episodio'),
+    'name': (COL_NAME, 'NOME', 'Nome', 'personagem', 'PERSONAGEM', 'Nome do personagem'),
+    'name_alt': ('PERSONAGEM', 'Personagem'),
+    'id': (COL_FILE_ID, 'ID', 'Id', 'ID do Arquivo'),
+    'rig_link': (COL_RIG_LINK, 'LINK RIG', 'Link Rig'),
+    'sync': (COL_SYNCSKETCH, 'SYNC SKETCH', 'SyncSketch', 'Sync Sketch'),
+    'concept_link': (COL_CONCEPT_LINK, 'LINKS CONCEPT', 'Link Concept', 'LINK CONCEPT'),
+    'status_concept': (COL_STATUS_CONCEPT, 'STATUS CONCEPT', 'Status Concept'),
+    'status_rig': (COL_STATUS_RIG, 'STATUS RIG', 'Status Rig'),
+    'resp_rig': (COL_RESP_RIG, 'RESPONSÁVEL', 'Responsável', 'Responsável RIG', 'RESPONSAVEL'),
+    'resp_concept_draw': (COL_RESP_CONCEPT, 'RESPONSÁVEL CONCEPT', 'Responsável Concept', 'Responsável (Desenho)'),
+    'resp_concept_vect': ('RESPONSÁVEL VETORIZAÇÃO', 'Responsável Vetorização', 'Responsável (Vetorização)'),
+    'comments': (COL_COMMENTS, 'COMENTÁRIOS', 'Comentários', 'Comentarios'),
+}
+
+
+# Tabela de transliteração do Latin-1 (acentos do português etc.), montada uma vez
+# com o próprio unidecode: str.translate é um laço em C, sem o despacho por codepoint
+_LATIN1_TRANS = str.maketrans({chr(i): unidecode(chr(i)) for i in range(128, 256)})
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+# Poucos valores distintos (status, responsáveis, episódios): as funções de
+# normalização/classificação são memoizadas e viram uma consulta de dicionário
+@functools.lru_cache(maxsize=4096)
 def _norm(s: str) -> str:
     # Normaliza para ascii sem acentos e remove não alfanuméricos
-    return re.sub(r"[^a-z0-9]+", "", unidecode(str(s or "").strip().lower()))
+    s = str(s or "").strip().lower()
+    # unidecode só para caracteres fora do Latin-1 (raros nesta planilha)
+    s = s.translate(_LATIN1_TRANS) if max(s, default='') <= '\xff' else unidecode(s)
+    return _NON_ALNUM_RE.sub("", s)
+
+
+# Palavras-chave de cada tipo de status (sobre o texto já normalizado),
+# uma regex por tipo: uma varredura em C em vez de vários testes 'in'
+_RE_DONE = re.compile(r"concluido")
+# Revisão / Análise (considera variações com ou sem 'pendente de')
+_RE_REVIEW = re.compile(r"revisao|analise|pendentederevisao|pendentedeanalise")
+# Em produção - expandir as variações
+_RE_WIP = re.compile(r"emproducao|emandamento|producao|progresso")
+_RE_TODO = re.compile(r"naoiniciado|naoiniciada|nao_iniciado")
 
+# Episódios e montagem de IDs a partir do nome (usadas por linha/candidato)
+_RE_DIGITS = re.compile(r"\d+")
+_RE_NONWORD = re.compile(r"[^a-zA-Z0-9_]")
+_RE_UNDERSCORES = re.compile(r"_+")
+_RE_CONECTORES = re.compile(r"\b(DE|DA|DO|E|COM|PARA|EM|NA|NO)\b")
+_RE_WORDSPLIT = re.compile(r"[_\s]+")
 
+
+# Prioridade dos status abertos (maior = mais "aberto")
+_KIND_RANK = {'wip': 3, 'review': 2, 'todo': 1}
+# 'kind' das tarefas como Categorical ordenado: código + 1 == _KIND_RANK
+_KIND_DTYPE = pd.CategoricalDtype(['todo', 'review', 'wip'], ordered=True)
+
+
+@functools.lru_cache(maxsize=4096)
 def _status_kind(s: str) -> str:
     """Classifica um status em: done | review | wip | todo | other"""
     ns = _norm(s)
-    # Debug: verificar o status normalizado
-    if 'concluido' in ns:
+    if _RE_DONE.search(ns):
         return 'done'
-    # Revisão / Análise (considera variações com ou sem 'pendente de')
-    if any(k in ns for k in ['revisao','analise','pendentederevisao','pendentedeanalise']):
+    if _RE_REVIEW.search(ns):
         return 'review'
-    # Em produção - expandir as variações
-    if any(k in ns for k in ['emproducao', 'emandamento', 'producao', 'progresso']):
+    if _RE_WIP.search(ns):
         return 'wip'
-    if any(k in ns for k in ['naoiniciado', 'naoiniciada', 'nao_iniciado']):
+    if _RE_TODO.search(ns):
         return 'todo'
     return 'other'
 
 
-def _parse_eps(val) -> set:
-    s = str(val or '').strip()
+def _parse_eps(val) -> frozenset:
+    return _parse_eps_str(str(val or '').strip())
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_eps_str(s: str) -> frozenset:
+    # frozenset: o resultado é compartilhado pelo cache, então não pode ser alterado
     if not s:
-        return set()
+        return frozenset()
     if s.lower() == 'todos':
-        return {'ALL'}
-    return {int(x) for x in re.findall(r"\d+", s)}
+        return frozenset({'ALL'})
+    return frozenset(int(x) for x in _RE_DIGITS.findall(s))
 
 
-def _split_names(resp_str: str) -> List[str]:
-    """Split múltiplos responsáveis separados por / , &, etc."""
-    if not resp_str or str(resp_str).strip() in ['', 'nan', 'None']:
-        return []
-    names = re.split(r'[/,&;]+', str(resp_str))
-    return [n.strip() for n in names if n.strip()]
+# Cores do PNG exportado por tipo de status: fundo da célula e marcador (no lugar dos emojis,
+# que as fontes comuns não desenham)
+_PNG_STATUS_BG = {
+    'wip': '#fef3c7',      # Em produção - amarelo
+    'review': '#dbeafe',   # Revisão - azul
+    'done': '#dcfce7',     # Concluído - verde
+    'todo': '#f3f4f6',     # Não iniciado - cinza
+    'other': '#fee2e2',    # Outros - vermelho
+}
+_PNG_STATUS_MARK = {'wip': '#f97316', 'review': '#eab308', 'todo': '#ffffff', 'done': '#22c55e', 'other': '#ef4444'}
+
+
+# Tabelas grandes: resolução simples acima de _PNG_HIRES_MAX_ROWS e corte em _PNG_MAX_ROWS
+# linhas (memória/tempo da imagem crescem com a área)
+_PNG_HIRES_MAX_ROWS = 200
+_PNG_MAX_ROWS = 500
+
+
+@functools.lru_cache(maxsize=16)
+def _png_font(size: int, bold: bool = False):
+    """Fonte TrueType para o PNG (Arial no Windows, DejaVu no Linux); cai para a fonte padrão do PIL."""
+    from PIL import ImageFont  # type: ignore
+    for name in (('arialbd.ttf', 'DejaVuSans-Bold.ttf') if bold else ('arial.ttf', 'DejaVuSans.ttf')):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
 
 
 def create_table_png(df: pd.DataFrame, get_thumb: Optional[Callable[[str, str, int], str]] = None) -> bytes:
-    """Cria uma imagem PNG da tabela com miniaturas."""
+    """Cria uma imagem PNG da tabela com miniaturas.
+
+    Desenhada direto com PIL (retângulos e textos), sem figura/eixos do matplotlib.
+    """
+    # PIL só é carregado quando o PNG é de fato exportado
+    from PIL import Image, ImageDraw  # type: ignore
+    # Resolução dobrada (equivale ao dpi=200 anterior) enquanto a tabela é pequena
+    scale = 2 if len(df) <= _PNG_HIRES_MAX_ROWS else 1
+    hidden = max(0, len(df) - _PNG_MAX_ROWS)
+    df = df.head(_PNG_MAX_ROWS)
     if df.empty:
         # Criar imagem vazia se não há dados
-        fig, ax = plt.subplots(figsize=(12, 2))
-        ax.text(0.5, 0.5, 'Nenhum dado disponível', ha='center', va='center', fontsize=16)
-        ax.set_xlim(0, 1)
-        ax.set_ylim(0, 1)
-        ax.axis('off')
-        
+        img = Image.new('RGB', (600 * scale, 100 * scale), 'white')
+        ImageDraw.Draw(img).text((300 * scale, 50 * scale), 'Nenhum dado disponível',
+                                 font=_png_font(16 * scale), fill='#111827', anchor='mm')
         buf = io.BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight', dpi=150, facecolor='white')
-        plt.close()
-        buf.seek(0)
+        img.save(buf, 'PNG', optimize=False)
         return buf.getvalue()
-    
+
     # Configurações visuais
-    row_height = 90
-    col_widths = [90, 250, 180, 180, 180]  # Imagem, Personagem, Status Concept, Status Rig, Responsável
+    row_height = 90 * scale
+    col_widths = [w * scale for w in (90, 250, 180, 180, 180)]  # Imagem, Personagem, Status Concept, Status Rig, Responsável
+    title_height = 60 * scale
     total_width = sum(col_widths)
-    total_height = (len(df) + 1) * row_height  # +1 para header
-    
-    # Criar figura com alta qualidade
-    plt.style.use('default')
-    fig = plt.figure(figsize=(total_width/100, total_height/100), dpi=200)
-    ax = fig.add_subplot(111)
-    ax.set_xlim(0, total_width)
-    ax.set_ylim(0, total_height)
-    ax.axis('off')
-    
-    # Cores dos status
-    status_colors = {
-        'wip': '#fef3c7',      # Em produção - amarelo
-        'review': '#dbeafe',   # Revisão - azul
-        'done': '#dcfce7',     # Concluído - verde
-        'todo': '#f3f4f6',     # Não iniciado - cinza
-        'other': '#fee2e2'     # Outros - vermelho
-    }
-    
+    footer_height = 40 * scale if hidden else 0
+    total_height = title_height + (len(df) + 1) * row_height + footer_height  # +1 para header
+    x_cols = [sum(col_widths[:i]) for i in range(len(col_widths))]
+    pad = 15 * scale
+    grid = '#d1d5db'
+
+    img = Image.new('RGB', (total_width, total_height), 'white')
+    draw = ImageDraw.Draw(img)
+    f_title = _png_font(16 * scale, bold=True)
+    f_header = _png_font(12 * scale, bold=True)
+    f_name = _png_font(11 * scale, bold=True)
+    f_text = _png_font(10 * scale)
+    f_small = _png_font(9 * scale)
+
+    # Título e data
+    draw.text((total_width // 2, title_height // 2),
+              f'Lista de Demandas - {pd.Timestamp.now().strftime("%d/%m/%Y %H:%M")}',
+              font=f_title, fill='#111827', anchor='mm')
+
     # Header com estilo melhorado
     headers = ['Miniatura', 'Personagem', 'Status Concept', 'Status Rig', 'Responsável']
-    x_pos = 0
-    for i, (header, width) in enumerate(zip(headers, col_widths)):
-        # Fundo do header
-        rect = patches.Rectangle((x_pos, total_height - row_height), width, row_height, 
-                               linewidth=2, edgecolor='#374151', facecolor='#e5e7eb')
-        ax.add_patch(rect)
-        
-        # Texto do header
-        ax.text(x_pos + width/2, total_height - row_height/2, header, 
-               ha='center', va='center', fontweight='bold', fontsize=12, color='#1f2937')
-        x_pos += width
-    
+    y0 = title_height
+    for header, x0, width in zip(headers, x_cols, col_widths):
+        draw.rectangle((x0, y0, x0 + width - 1, y0 + row_height - 1), fill='#e5e7eb', outline='#374151', width=2 * scale)
+        draw.text((x0 + width // 2, y0 + row_height // 2), header, font=f_header, fill='#1f2937', anchor='mm')
+
+    def status_cell(x0: int, y0: int, width: int, status: str) -> None:
+        kind = _status_kind(status)
+        draw.rectangle((x0, y0, x0 + width - 1, y0 + row_height - 1), fill=_PNG_STATUS_BG.get(kind, '#f3f4f6'), outline=grid)
+        # Marcador de status (quadrado colorido) seguido do texto
+        cy = y0 + row_height // 2
+        mk = 5 * scale
+        draw.rectangle((x0 + pad, cy - mk, x0 + pad + 2 * mk, cy + mk),
+                       fill=_PNG_STATUS_MARK.get(kind, '#ffffff'), outline='#6b7280')
+        text = status[:15] + ('...' if len(status) > 15 else '')
+        draw.text((x0 + pad + 3 * mk, cy), text, font=f_small, fill='#374151', anchor='lm')
+
     # Dados das linhas
-    for row_idx, (_, row) in enumerate(df.iterrows()):
-        y_pos = total_height - (row_idx + 2) * row_height
-        x_pos = 0
-        
+    cols = [df[c].astype(str).tolist() if c in df.columns else [''] * len(df)
+            for c in ('file_id', 'personagem', 'status_concept', 'status_rig', 'responsavel')]
+    for row_idx, (fid, personagem, status_concept, status_rig, responsavel) in enumerate(zip(*cols)):
+        y0 = title_height + (row_idx + 1) * row_height
+        cy = y0 + row_height // 2
         # Cor de fundo alternada
         bg_color = '#ffffff' if row_idx % 2 == 0 else '#f9fafb'
-        
+
         # Imagem (miniatura)
-        img_rect = patches.Rectangle((x_pos, y_pos), col_widths[0], row_height,
-                                   linewidth=1, edgecolor='#d1d5db', facecolor=bg_color)
-        ax.add_patch(img_rect)
-        
+        x0 = x_cols[0]
+        draw.rectangle((x0, y0, x0 + col_widths[0] - 1, y0 + row_height - 1), fill=bg_color, outline=grid)
         if get_thumb:
-            fid = str(row.get('file_id', ''))
-            name = str(row.get('personagem', ''))
-            thumb_uri = get_thumb(fid, name, 80)
-            
+            thumb_uri = get_thumb(fid, personagem, 80)
             # Placeholder para miniatura
-            thumb_rect = patches.Rectangle((x_pos + 5, y_pos + 5), col_widths[0] - 10, row_height - 10,
-                                         linewidth=1, edgecolor='#9ca3af', facecolor='#f3f4f6', 
-                                         linestyle='--', alpha=0.7)
-            ax.add_patch(thumb_rect)
-            
+            m = 5 * scale
+            draw.rectangle((x0 + m, y0 + m, x0 + col_widths[0] - m, y0 + row_height - m), fill='#f3f4f6', outline='#9ca3af')
             if thumb_uri:
                 # Indicador de que há miniatura
-                ax.text(x_pos + col_widths[0]/2, y_pos + row_height/2, '🖼️\nMiniatura', 
-                       ha='center', va='center', fontsize=10, color='#059669')
+                draw.text((x0 + col_widths[0] // 2, cy), 'Miniatura', font=f_text, fill='#059669', anchor='mm')
             else:
-                ax.text(x_pos + col_widths[0]/2, y_pos + row_height/2, '📷\nSem imagem', 
-                       ha='center', va='center', fontsize=9, color='#6b7280', alpha=0.7)
-        
-        x_pos += col_widths[0]
-        
-        # Personagem
-        pers_rect = patches.Rectangle((x_pos, y_pos), col_widths[1], row_height,
-                                    linewidth=1, edgecolor='#d1d5db', facecolor=bg_color)
-        ax.add_patch(pers_rect)
-        
-        personagem = str(row.get('personagem', ''))
-        # Quebrar texto se muito longo
+                draw.text((x0 + col_widths[0] // 2, cy), 'Sem imagem', font=f_small, fill='#6b7280', anchor='mm')
+
+        # Personagem (texto longo é cortado)
+        x0 = x_cols[1]
+        draw.rectangle((x0, y0, x0 + col_widths[1] - 1, y0 + row_height - 1), fill=bg_color, outline=grid)
         if len(personagem) > 25:
             personagem = personagem[:22] + '...'
-        
-        ax.text(x_pos + 15, y_pos + row_height/2, personagem, 
-               ha='left', va='center', fontsize=11, fontweight='bold', color='#111827')
-        x_pos += col_widths[1]
-        
-        # Status Concept
-        status_concept = str(row.get('status_concept', ''))
-        status_kind_concept = _status_kind(status_concept)
-        color_concept = status_colors.get(status_kind_concept, '#f3f4f6')
-        
-        concept_rect = patches.Rectangle((x_pos, y_pos), col_widths[2], row_height,
-                                       linewidth=1, edgecolor='#d1d5db', facecolor=color_concept)
-        ax.add_patch(concept_rect)
-        
-        # Adicionar ícone de status
-        status_icons = {'wip': '🟧', 'review': '🟨', 'todo': '⬜', 'done': '🟩', 'other': '🔴'}
-        icon = status_icons.get(status_kind_concept, '⬜')
-        
-        status_text = status_concept[:15] + ('...' if len(status_concept) > 15 else '')
-        ax.text(x_pos + 15, y_pos + row_height/2, f"{icon} {status_text}", 
-               ha='left', va='center', fontsize=9, color='#374151')
-        x_pos += col_widths[2]
-        
-        # Status Rig
-        status_rig = str(row.get('status_rig', ''))
-        status_kind_rig = _status_kind(status_rig)
-        color_rig = status_colors.get(status_kind_rig, '#f3f4f6')
-        
-        rig_rect = patches.Rectangle((x_pos, y_pos), col_widths[3], row_height,
-                                   linewidth=1, edgecolor='#d1d5db', facecolor=color_rig)
-        ax.add_patch(rig_rect)
-        
-        icon = status_icons.get(status_kind_rig, '⬜')
-        status_text = status_rig[:15] + ('...' if len(status_rig) > 15 else '')
-        ax.text(x_pos + 15, y_pos + row_height/2, f"{icon} {status_text}", 
-               ha='left', va='center', fontsize=9, color='#374151')
-        x_pos += col_widths[3]
-        
+        draw.text((x0 + pad, cy), personagem, font=f_name, fill='#111827', anchor='lm')
+
+        # Status Concept / Status Rig
+        status_cell(x_cols[2], y0, col_widths[2], status_concept)
+        status_cell(x_cols[3], y0, col_widths[3], status_rig)
+
         # Responsável
-        responsavel = str(row.get('responsavel', ''))
+        x0 = x_cols[4]
         if len(responsavel) > 20:
             responsavel = responsavel[:17] + '...'
-        
-        resp_rect = patches.Rectangle((x_pos, y_pos), col_widths[4], row_height,
-                                    linewidth=1, edgecolor='#d1d5db', facecolor=bg_color)
-        ax.add_patch(resp_rect)
-        
-        ax.text(x_pos + 15, y_pos + row_height/2, responsavel, 
-               ha='left', va='center', fontsize=10, color='#374151')
-    
-    # Adicionar título e data
-    fig.suptitle(f'Lista de Demandas - {pd.Timestamp.now().strftime("%d/%m/%Y %H:%M")}', 
-                fontsize=16, fontweight='bold', y=0.98)
-    
-    # Salvar como PNG com alta qualidade
+        draw.rectangle((x0, y0, x0 + col_widths[4] - 1, y0 + row_height - 1), fill=bg_color, outline=grid)
+        draw.text((x0 + pad, cy), responsavel, font=f_text, fill='#374151', anchor='lm')
+
+    if hidden:
+        draw.text((total_width // 2, total_height - footer_height // 2),
+                  f'... e mais {hidden} itens (refine os filtros para exportar o restante)',
+                  font=f_text, fill='#6b7280', anchor='mm')
+
     buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight', dpi=200, facecolor='white', 
-                edgecolor='none', pad_inches=0.2)
-    plt.close()
-    buf.seek(0)
+    img.save(buf, 'PNG', optimize=False)
     return buf.getvalue()
 
 
+def _df_digest(df: pd.DataFrame) -> str:
+    """Assinatura curta do conteúdo (colunas + valores, na ordem das linhas)."""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(repr(list(df.columns)).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)
+def _cached_table_png(df_digest: str, with_thumbs: bool, _df: pd.DataFrame,
+                      _get_thumb: Optional[Callable[[str, str, int], str]] = None) -> bytes:
+    """create_table_png cacheado pelo conteúdo da tabela.
+
+    Argumentos com '_' não entram no hash; ttl curto porque o título leva data/hora.
+    """
+    return create_table_png(_df, _get_thumb)
+
+
+@st.cache_data(ttl=300, max_entries=1024, show_spinner=False)
+def _cached_thumb(fid: str, name: str, size: int,
+                  _get_thumb: Callable[[str, str, int], str]) -> str:
+    """get_thumb memoizado por (fid, nome, tamanho), inclusive os candidatos sem imagem.
+
+    Limpo pelo botão 'Atualizar miniaturas'; o ttl cobre imagens novas na pasta.
+    """
+    return _get_thumb(fid, name, size) or ''
+
+
+@st.cache_data(ttl=300, max_entries=4096, show_spinner=False)
+def _resolve_thumb(candidates: Tuple[str, ...], name: str, size: int,
+                   _get_thumb: Callable[[str, str, int], str],
+                   _has_thumb_id: Optional[Callable[[str], bool]] = None) -> str:
+    """Primeira miniatura encontrada entre os candidatos ('' se nenhum tiver imagem).
+
+    Memoizada pela tupla de candidatos: nos reruns seguintes o personagem vai direto ao
+    resultado, e os que não têm imagem não refazem a varredura.
+    """
+    for i, cid in enumerate(candidates):
+        # O primeiro candidato já cobre a busca pelo nome; dos demais só importa o ID,
+        # então quem não está no índice de imagens nem chega ao get_thumb
+        if i and _has_thumb_id is not None and not _has_thumb_id(cid):
+            continue
+        img_data = _cached_thumb(cid, name, size, _get_thumb)
+        if img_data:
+            return img_data
+    return ''
+
+
+# st.fragment (Streamlit >= 1.37; antes experimental_fragment): filtros da aba
+# reexecutam só a aba, sem refazer o resto do app
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda f: f)
+
+
+_SPLIT_NAMES_RE = re.compile(r"\s*(?:,|;|/|\||&|\+|\be\b|\band\b)\s*", re.IGNORECASE)
+
+
 def _split_names(resp_str: str) -> List[str]:
     """Divide strings de responsáveis em nomes individuais (vírgula, barra, ponto e vírgula, 'e', '&', etc.)
     e remove duplicados preservando a ordem.
     """
-    pat = re.compile(r"\s*(?:,|;|/|\||&|\+|\be\b|\band\b)\s*", re.IGNORECASE)
-    parts = [p.strip() for p in pat.split(str(resp_str or '')) if str(p).strip()]
-    seen = set()
-    uniq: List[str] = []
-    for name in parts:
-        key = _norm(name)
-        if key and key not in seen:
-            seen.add(key)
-            uniq.append(name)
-    return uniq
+    parts = [p.strip() for p in _SPLIT_NAMES_RE.split(str(resp_str or '')) if p.strip()]
+    return _dedupe_preserve(parts)
 
 
 def _dedupe_preserve(seq: List[str]) -> List[str]:
-    seen = set()
-    out: List[str] = []
+    # dict mantém a ordem de inserção; setdefault guarda a primeira grafia de cada nome normalizado
+    seen: dict = {}
     for item in seq:
         key = _norm(item)
-        if key and key not in seen:
-            seen.add(key)
-            out.append(item)
-    return out
+        if key:
+            seen.setdefault(key, item)
+    return list(seen.values())
 
 
 _SVB_ID_RE = re.compile(r"\b(?:SVB|RIG|PER)_([A-Za-z0-9]+)\b", re.IGNORECASE)
@@ -299,14 +377,61 @@ def _extract_svb_id(*texts: str) -> str:
     return ''
 
 
+def _svb_id_col(s: pd.Series) -> pd.Series:
+    """Versão vetorizada de _extract_svb_id: uma busca de regex por coluna ('' quando não há ID)."""
+    m = s.astype(str).str.extract(_SVB_ID_RE, expand=False)
+    return ('SVB_' + m.str.upper()).fillna('')
+
+
 def _std_svb_id(s: str) -> str:
     """Normaliza para 'SVB_XXXXX' em maiúsculas se casar o padrão (SVB|RIG|PER)."""
     m = _SVB_ID_RE.search(str(s or ''))
     return (f"SVB_{m.group(1).upper()}" if m else str(s or ''))
 
 
+_NAME_ID_PREFIXES = ('SVB_RIG_', 'SVB_PER_', 'SVB_')
+
+
+@functools.lru_cache(maxsize=2048)
+def _name_thumb_candidates(nome: str) -> Tuple[str, ...]:
+    """IDs de arquivo prováveis montados a partir do nome do personagem, já normalizados.
+
+    Ex.: 'TIA REBIMBOCA DE MOCHILA' -> SVB_RIG_TIA_REBIMBOCA_DE_MOCHILA, ..., SVB_RIG_TIA_REBIMBOCA, ...
+    """
+    if not nome:
+        return ()
+    nome_up = nome.upper()
+    variants: List[str] = []
+    # Nome original limpo
+    nome_norm = _RE_UNDERSCORES.sub('_', _RE_NONWORD.sub('_', nome_up.strip())).strip('_')
+    if nome_norm:
+        variants.append(nome_norm)
+    # Sem palavras conectoras comuns
+    sem_conectores = _RE_NONWORD.sub('_', _RE_CONECTORES.sub('', nome_up).strip())
+    sem_conectores = _RE_UNDERSCORES.sub('_', sem_conectores).strip('_')
+    if sem_conectores and sem_conectores != nome_norm:
+        variants.append(sem_conectores)
+    # Primeira palavra + segunda palavra (ex: "TIA_REBIMBOCA")
+    palavras = [p for p in _RE_WORDSPLIT.split(nome_up) if len(p) >= 3]
+    if len(palavras) >= 2:
+        variants.append(f"{palavras[0]}_{palavras[1]}")
+    out: List[str] = []
+    for v in variants:
+        out.extend(p + v for p in _NAME_ID_PREFIXES)
+        out.append(v)  # Nome puro para fallback
+    # Palavras individuais maiores como fallback
+    for palavra in palavras:
+        if len(palavra) >= 4:
+            out.extend(p + palavra for p in _NAME_ID_PREFIXES)
+    return tuple(_std_svb_id(c) for c in out)
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _df_digest})
 def build_open_tasks(df: pd.DataFrame) -> pd.DataFrame:
-    """Gera linhas para tarefas abertas (WIP/Review/Todo) de Concept e Rig."""
+    """Gera linhas para tarefas abertas (WIP/Review/Todo) de Concept e Rig.
+
+    Cacheado pelo conteúdo do DataFrame: widgets da aba não refazem o parsing.
+    """
     # Resolve nomes de colunas de acordo com o CSV atual, com fallbacks
     def pick(*cands: str) -> Optional[str]:
         for c in cands:
@@ -314,86 +439,156 @@ def build_open_tasks(df: pd.DataFrame) -> pd.DataFrame:
                 return c
         return None
 
-    ep_col = pick(COL_EP, 'EPS', 'Episódio', 'Episodio')
-    name_col_primary = pick(COL_NAME, 'NOME', 'Nome', 'personagem', 'PERSONAGEM', 'Nome do personagem')
-    name_col_alt = pick('PERSONAGEM', 'Personagem')
-    id_col = pick(COL_FILE_ID, 'ID', 'Id', 'ID do Arquivo')
-    rig_link_col = pick(COL_RIG_LINK, 'LINK RIG', 'Link Rig')
-    sync_col = pick(COL_SYNCSKETCH, 'SYNC SKETCH', 'SyncSketch', 'Sync Sketch')
-    concept_link_col = pick(COL_CONCEPT_LINK, 'LINKS CONCEPT', 'Link Concept', 'LINK CONCEPT')
-    status_concept_col = pick(COL_STATUS_CONCEPT, 'STATUS CONCEPT', 'Status Concept')
-    status_rig_col = pick(COL_STATUS_RIG, 'STATUS RIG', 'Status Rig')
-    resp_rig_col = pick(COL_RESP_RIG, 'RESPONSÁVEL', 'Responsável', 'Responsável RIG', 'RESPONSAVEL')
-    resp_concept_draw_col = pick(COL_RESP_CONCEPT, 'RESPONSÁVEL CONCEPT', 'Responsável Concept', 'Responsável (Desenho)')
-    resp_concept_vect_col = pick('RESPONSÁVEL VETORIZAÇÃO', 'Responsável Vetorização', 'Responsável (Vetorização)')
-    comments_col = pick(COL_COMMENTS, 'COMENTÁRIOS', 'Comentários', 'Comentarios')
-
-    recs: List[dict] = []
-    for _, r in df.iterrows():
-        ep_raw = r.get(ep_col, '') if ep_col else ''
-        # Nome: prioriza coluna principal, cai para alternativa
-        nm_raw_primary = r.get(name_col_primary, '') if name_col_primary else ''
-        nm_raw_alt = r.get(name_col_alt, '') if name_col_alt else ''
-        nm = str(nm_raw_primary or nm_raw_alt or '')
-        fid = str(r.get(id_col, '')) if id_col else ''
-        # Concept
-        status_concept_raw = str(r.get(status_concept_col, '')) if status_concept_col else ''
-        sk_c = _status_kind(status_concept_raw)
-        if sk_c in {'wip', 'review', 'todo'}:
-            # Responsáveis de Concept: desenho + vetorização (se existirem)
-            resp_c_parts: List[str] = []
-            if resp_concept_draw_col:
-                resp_c_parts.append(str(r.get(resp_concept_draw_col, '') or ''))
-            if resp_concept_vect_col:
-                resp_c_parts.append(str(r.get(resp_concept_vect_col, '') or ''))
-            resp_c_merged = ' / '.join([p for p in resp_c_parts if str(p).strip()])
-            recs.append({
-                'episodio': ep_raw,
-                'ep_first': min({e for e in _parse_eps(ep_raw) if isinstance(e, int)}) if _parse_eps(ep_raw) else 9999,
-                'etapa': 'Concept',
-                'nome': nm,
-                'id': fid,
-                'responsavel': resp_c_merged,
-                'status': status_concept_raw,
-                'kind': sk_c,
-                'status_c': status_concept_raw,
-                'status_r': str(r.get(status_rig_col, '')) if status_rig_col else '',
-                'resp_c': resp_c_merged,
-                'resp_r': str(r.get(resp_rig_col, '')) if resp_rig_col else '',
-                'link': str(r.get(concept_link_col, '')) if concept_link_col else '',
-                'sync': str(r.get(sync_col, '')) if sync_col else '',
-                'comentarios': str(r.get(comments_col, '')) if comments_col else '',
-            })
-        # Rig
-        sk_r = _status_kind(r.get(status_rig_col, '') if status_rig_col else '')
-        if sk_r in {'wip', 'review', 'todo'}:
-            recs.append({
-                'episodio': ep_raw,
-                'ep_first': min({e for e in _parse_eps(ep_raw) if isinstance(e, int)}) if _parse_eps(ep_raw) else 9999,
-                'etapa': 'Rig',
-                'nome': nm,
-                'id': fid,
-                'responsavel': str(r.get(resp_rig_col, '')) if resp_rig_col else '',
-                'status': str(r.get(status_rig_col, '')) if status_rig_col else '',
-                'kind': sk_r,
-                'status_c': str(r.get(status_concept_col, '')) if status_concept_col else '',
-                'status_r': str(r.get(status_rig_col, '')) if status_rig_col else '',
-                'resp_c': str(r.get(resp_concept_draw_col, '') or '') + (
-                    (" / " + str(r.get(resp_concept_vect_col, '') or '')) if resp_concept_vect_col else ''
-                ),
-                'resp_r': str(r.get(resp_rig_col, '')) if resp_rig_col else '',
-                'link': str(r.get(rig_link_col, '')) if rig_link_col else '',
-                'sync': str(r.get(sync_col, '')) if sync_col else '',
-                'comentarios': str(r.get(comments_col, '')) if comments_col else '',
-            })
-    if not recs:
-        return pd.DataFrame(columns=['episodio','ep_first','etapa','nome','id','responsavel','status','kind','status_c','status_r','resp_c','resp_r','link','sync','comentarios'])
-    out = pd.DataFrame.from_records(recs)
-    out.sort_values(['ep_first','etapa','nome'], inplace=True)
+    aliases = OPEN_TASK_COLUMN_ALIASES
+    ep_col = pick(*aliases['ep'])
+    name_col_primary = pick(*aliases['name'])
+    name_col_alt = pick(*aliases['name_alt'])
+    id_col = pick(*aliases['id'])
+    rig_link_col = pick(*aliases['rig_link'])
+    sync_col = pick(*aliases['sync'])
+    concept_link_col = pick(*aliases['concept_link'])
+    status_concept_col = pick(*aliases['status_concept'])
+    status_rig_col = pick(*aliases['status_rig'])
+    resp_rig_col = pick(*aliases['resp_rig'])
+    resp_concept_draw_col = pick(*aliases['resp_concept_draw'])
+    resp_concept_vect_col = pick(*aliases['resp_concept_vect'])
+    comments_col = pick(*aliases['comments'])
+
+    # Colunas inteiras de uma vez; astype(str) reproduz o str(...) por célula (NaN -> 'nan')
+    def col(c: Optional[str]) -> pd.Series:
+        return df[c].astype(str) if c else pd.Series('', index=df.index, dtype=object)
+
+    def kinds(s: pd.Series) -> pd.Series:
+        # Poucos status distintos: classifica cada valor uma vez
+        tbl = {v: _status_kind(v) for v in s.unique()}
+        return s.map(tbl)
+
+    ep_raw = df[ep_col] if ep_col else pd.Series('', index=df.index, dtype=object)
+    # Episódios de cada linha (frozenset, usado nos filtros) e o menor número
+    # (9999 quando não há números, ex.: 'Todos'), ambos calculados uma vez aqui
+    eps_sets = ep_raw.map(_parse_eps)
+    ep_first = pd.Series(np.fromiter((min(s) if s and 'ALL' not in s else 9999 for s in eps_sets),
+                                     dtype=np.int32, count=len(eps_sets)), index=df.index)
+    # Nome: prioriza coluna principal, cai para alternativa quando vazia
+    nm_primary = df[name_col_primary] if name_col_primary else pd.Series('', index=df.index, dtype=object)
+    nm_alt = df[name_col_alt] if name_col_alt else ''
+    nm = nm_primary.where(nm_primary != '', nm_alt).astype(str)
+    fid = col(id_col)
+    status_c = col(status_concept_col)
+    status_r = col(status_rig_col)
+    kind_c = kinds(status_c)
+    kind_r = kinds(status_r)
+    resp_r = col(resp_rig_col)
+    sync = col(sync_col)
+    comments = col(comments_col)
+    # Responsáveis de Concept: desenho + vetorização (se existirem)
+    resp_draw = col(resp_concept_draw_col)
+    resp_vect = col(resp_concept_vect_col)
+    draw_ok = resp_draw.str.strip() != ''
+    vect_ok = resp_vect.str.strip() != ''
+    resp_c_merged = pd.Series(np.where(draw_ok & vect_ok, resp_draw + ' / ' + resp_vect,
+                                       np.where(draw_ok, resp_draw, np.where(vect_ok, resp_vect, ''))),
+                              index=df.index, dtype=object)
+    resp_c_rig = (resp_draw + ' / ' + resp_vect) if resp_concept_vect_col else resp_draw
+
+    open_kinds = list(_KIND_RANK)
+    concept = pd.DataFrame({
+        'episodio': ep_raw, 'ep_first': ep_first, '__eps_set__': eps_sets, 'etapa': 'Concept', 'nome': nm, 'id': fid,
+        'responsavel': resp_c_merged, 'status': status_c, 'kind': kind_c,
+        'status_c': status_c, 'status_r': status_r, 'resp_c': resp_c_merged, 'resp_r': resp_r,
+        'link': col(concept_link_col), 'sync': sync, 'comentarios': comments,
+    })[kind_c.isin(open_kinds)]
+    rig = pd.DataFrame({
+        'episodio': ep_raw, 'ep_first': ep_first, '__eps_set__': eps_sets, 'etapa': 'Rig', 'nome': nm, 'id': fid,
+        'responsavel': resp_r, 'status': status_r, 'kind': kind_r,
+        'status_c': status_c, 'status_r': status_r, 'resp_c': resp_c_rig, 'resp_r': resp_r,
+        'link': col(rig_link_col), 'sync': sync, 'comentarios': comments,
+    })[kind_r.isin(open_kinds)]
+    if concept.empty and rig.empty:
+        out = pd.DataFrame(columns=['episodio','ep_first','__eps_set__','etapa','nome','id','responsavel','status','kind','status_c','status_r','resp_c','resp_r','link','sync','comentarios'])
+    else:
+        out = pd.concat([concept, rig], ignore_index=True)
+        out.sort_values(['ep_first','etapa','nome'], inplace=True)
+    # Chave de busca (nome + ID em minúsculas, separados por um caractere que não se digita)
+    out['__search__'] = (out['nome'].astype(str) + '\x1f' + out['id'].astype(str)).str.lower()
+    # Poucos valores distintos: Categorical deixa isin/ordenação sobre códigos inteiros
+    out['kind'] = out['kind'].astype(_KIND_DTYPE)
+    for c in ('etapa', 'status_c', 'status_r'):
+        out[c] = out[c].astype('category')
     return out
 
 
-def render_list_tab(df: pd.DataFrame, get_thumb: Optional[Callable[[str, str, int], str]] = None):
+def _join_names(s: pd.Series) -> str:
+    """Responsáveis do grupo, separados e únicos (na ordem em que aparecem)."""
+    return ', '.join(_dedupe_preserve([n for v in s for n in _split_names(v)]))
+
+
+def _best_task_id(pid: str, nome: str, link_id: str, sync_id: str, comment_id: str) -> str:
+    """ID do cartão: o próprio ID (padronizado), senão um SVB_ de links/sync/comentários, senão o nome."""
+    if str(pid).strip():
+        return _std_svb_id(pid)
+    found = link_id or sync_id or comment_id
+    if found:
+        return found
+    if nome:
+        nome_clean = _RE_NONWORD.sub('_', nome.upper().strip())
+        nome_clean = _RE_UNDERSCORES.sub('_', nome_clean).strip('_')
+        if nome_clean:
+            return _std_svb_id(f"SVB_RIG_{nome_clean}")
+    return str(pid)
+
+
+@st.cache_data(show_spinner=False, max_entries=64, hash_funcs={pd.DataFrame: _df_digest})
+def _aggregate_open_tasks(fil: pd.DataFrame) -> pd.DataFrame:
+    """Agrega as tarefas por (id, nome): um cartão por personagem com ambos os status.
+
+    Ordena uma vez pelo status mais "aberto" (__rank__) e reduz com um único groupby.agg;
+    vazios viram NA para que 'first' pegue o primeiro valor preenchido do grupo.
+    Cacheado pelo conteúdo filtrado: cada combinação de filtros agrega uma vez.
+    """
+    if fil.empty:
+        return fil.head(0).copy()
+    srt = fil.sort_values('__rank__', ascending=False, kind='stable')
+
+    def filled(col: str) -> pd.Series:
+        s = srt[col].astype(str)
+        return s.where(s.str.strip() != '')
+
+    def svb_ids(col: str) -> pd.Series:
+        # IDs SVB_ citados em links/sync (extração vetorizada na coluna)
+        ids = _svb_id_col(srt[col])
+        return ids.where(ids != '')
+
+    work = pd.DataFrame({
+        'id': srt['id'], 'nome': srt['nome'],
+        'status_c': filled('status_c'), 'status_r': filled('status_r'),
+        'resp_c': srt['resp_c'], 'resp_r': srt['resp_r'],
+        'comentarios': filled('comentarios'), 'link': filled('link'), 'sync': filled('sync'),
+        'link_id': svb_ids('link'), 'sync_id': svb_ids('sync'),
+    })
+    agg = work.groupby(['id', 'nome'], dropna=False).agg(
+        status_c=('status_c', 'first'), status_r=('status_r', 'first'),
+        resp_c=('resp_c', _join_names), resp_r=('resp_r', _join_names),
+        comentarios=('comentarios', 'first'), link=('link', 'first'), sync=('sync', 'first'),
+        link_id=('link_id', 'first'), sync_id=('sync_id', 'first'),
+    ).reset_index()
+    for c in ('status_c', 'status_r', 'comentarios', 'link', 'sync', 'link_id', 'sync_id'):
+        agg[c] = agg[c].fillna('')
+    agg['comment_id'] = _svb_id_col(agg['comentarios'])
+    agg['id'] = [_best_task_id(*v) for v in zip(agg['id'], agg['nome'], agg['link_id'], agg['sync_id'], agg['comment_id'])]
+    agg['kind_c'] = agg['status_c'].map(_status_kind)
+    agg['kind_r'] = agg['status_r'].map(_status_kind)
+    # Kind agregado para ordenação/filtragem
+    rank = np.maximum(agg['kind_c'].map(_KIND_RANK).fillna(0), agg['kind_r'].map(_KIND_RANK).fillna(0))
+    agg['kind'] = rank.map({v: k for k, v in _KIND_RANK.items()}).fillna('other')
+    cols = ['id', 'nome', 'status_c', 'status_r', 'kind_c', 'kind_r', 'resp_c', 'resp_r',
+            'comentarios', 'link', 'sync', 'kind']
+    return agg[cols].sort_values(['nome'])
+
+
+@_fragment
+def render_list_tab(df: pd.DataFrame, get_thumb: Optional[Callable[[str, str, int], str]] = None,
+                    has_thumb_id: Optional[Callable[[str], bool]] = None):
     st.subheader('Lista — Demandas em andamento, revisão e não iniciadas')
     
     # Debug: mostrar colunas detectadas
@@ -468,14 +663,16 @@ def render_list_tab(df: pd.DataFrame, get_thumb: Optional[Callable[[str, str, in
 
     # Filtros
     # Episódios
-    all_eps = sorted({e for v in df.get(COL_EP, []).tolist() for e in _parse_eps(v) if isinstance(e, int)})
+    # Números de episódio extraídos por coluna ('Todos' não tem dígitos e fica de fora)
+    _ep_nums = df[COL_EP].astype(str).str.findall(_RE_DIGITS).explode().dropna() if COL_EP in df.columns else pd.Series(dtype=object)
+    all_eps = sorted(_ep_nums.astype(int).unique().tolist())
     sel_eps = st.multiselect('Episódios', options=all_eps, default=all_eps, key='ls_eps')
     sel_eps_set = set(sel_eps)
     # Etapas e responsáveis
     etapas = st.multiselect('Etapas', options=['Concept','Rig'], default=['Concept','Rig'], key='ls_etapas')
     # Extrai responsáveis individuais (suporta múltiplos nomes por célula)
-    _all_resp_cells = [x for x in tasks['responsavel'].dropna().astype(str).tolist() if str(x).strip()]
-    resps = sorted({n for cell in _all_resp_cells for n in _split_names(cell) if str(n).strip()})
+    _resp_names = tasks['responsavel'].dropna().astype(str).str.split(_SPLIT_NAMES_RE).explode().str.strip()
+    resps = sorted(_resp_names[_resp_names != ''].unique().tolist())
     sel_resps = st.multiselect('Responsáveis', options=resps, key='ls_resps')
     q = st.text_input('Buscar nome ou ID', key='ls_q')
     # Estágios de produção (filtro)
@@ -490,114 +687,28 @@ def render_list_tab(df: pd.DataFrame, get_thumb: Optional[Callable[[str, str, in
     sel_kinds = {stage_to_kind[s] for s in sel_stages}
 
     fil = tasks.copy()
+    # Responsáveis normalizados de cada tarefa (os episódios já vêm em __eps_set__):
+    # os filtros abaixo só testam interseção de conjuntos
+    fil['__resp_norm__'] = fil['responsavel'].map(
+        {v: frozenset(_norm(n) for n in _split_names(v)) for v in fil['responsavel'].unique()})
     if sel_kinds:
         fil = fil[fil['kind'].isin(sel_kinds)]
     # Aplicar filtros adicionais antes da agregação
     if sel_eps:
-        fil = fil[fil['episodio'].apply(lambda v: ('ALL' in _parse_eps(v)) or (len(_parse_eps(v) & sel_eps_set) > 0))]
+        eps_ok = {s: ('ALL' in s) or not s.isdisjoint(sel_eps_set) for s in fil['__eps_set__'].unique()}
+        fil = fil[fil['__eps_set__'].map(eps_ok).astype(bool)]
     if etapas and 'etapa' in fil.columns:
         fil = fil[fil['etapa'].isin(etapas)]
     if sel_resps:
-        _sel_norm = {_norm(x) for x in sel_resps}
-        fil = fil[fil['responsavel'].apply(lambda v: any(_norm(n) in _sel_norm for n in _split_names(v)))]
+        _sel_norm = frozenset(_norm(x) for x in sel_resps)
+        fil = fil[~fil['__resp_norm__'].map(_sel_norm.isdisjoint).astype(bool)]
     if q:
         qn = str(q).strip().lower()
-        fil = fil[(fil['nome'].astype(str).str.lower().str.contains(qn)) | (fil['id'].astype(str).str.lower().str.contains(qn))]
+        fil = fil[fil['__search__'].str.contains(qn, regex=False, na=False)]
     # Dedupe por personagem (ID) e etapa; agrega episódios e escolhe o status mais "aberto"
-    def _safe_eps_set(v):
-        try:
-            return _parse_eps(v)
-        except Exception:
-            return set()
-
-    if 'episodio' not in fil.columns:
-        fil['episodio'] = pd.Series(dtype=object)
-    fil['__eps_set__'] = fil['episodio'].apply(_safe_eps_set)
-    rank_map = {'wip':3, 'review':2, 'todo':1}
-    fil['__rank__'] = fil['kind'].map(rank_map).fillna(0)
-
-    # Agrega por (id, nome) — um cartão por personagem com ambos os status
-    groups = []
-    for (pid, nome), g in fil.groupby(['id','nome'], dropna=False):
-        gs = g.sort_values('__rank__', ascending=False)
-        # Melhores status por etapa
-        status_c = next((s for s in gs['status_c'].tolist() if str(s).strip()), '')
-        status_r = next((s for s in gs['status_r'].tolist() if str(s).strip()), '')
-        kind_c = _status_kind(status_c)
-        kind_r = _status_kind(status_r)
-        # Responsáveis (agregados e únicos)
-        _resp_c_all: List[str] = []
-        for s in gs['resp_c'].tolist():
-            _resp_c_all.extend(_split_names(s))
-        resp_c = ', '.join(_dedupe_preserve(_resp_c_all))
-
-        _resp_r_all: List[str] = []
-        for s in gs['resp_r'].tolist():
-            _resp_r_all.extend(_split_names(s))
-        resp_r = ', '.join(_dedupe_preserve(_resp_r_all))
-        # Comentários (qualquer)
-        comments = next((c for c in gs['comentarios'].tolist() if str(c).strip()), '')
-        # ID melhorado: tenta extrair SVB_ a partir de id/link/sync/comentários/nome
-        links = [s for s in gs.get('link', pd.Series([], dtype=object)).astype(str).tolist() if str(s).strip()]
-        syncs = [s for s in gs.get('sync', pd.Series([], dtype=object)).astype(str).tolist() if str(s).strip()]
-        
-        # Melhor extração de ID: tenta múltiplas fontes
-        candidate_ids = []
-        
-        # 1. ID original da linha
-        if str(pid).strip():
-            candidate_ids.append(str(pid))
-        
-        # 2. IDs extraídos de links e syncs
-        for text in links + syncs + [comments]:
-            extracted = _extract_svb_id(text)
-            if extracted:
-                candidate_ids.append(extracted)
-        
-        # 3. Construir ID a partir do nome
-        if nome:
-            nome_clean = re.sub(r'[^a-zA-Z0-9_]', '_', nome.upper().strip())
-            nome_clean = re.sub(r'_+', '_', nome_clean).strip('_')
-            if nome_clean:
-                candidate_ids.extend([
-                    f"SVB_RIG_{nome_clean}",
-                    f"SVB_PER_{nome_clean}",
-                    f"SVB_{nome_clean}"
-                ])
-        
-        # 4. Normalizar todos os candidatos
-        normalized_candidates = []
-        for cid in candidate_ids:
-            norm_id = _std_svb_id(cid)
-            if norm_id and norm_id not in normalized_candidates:
-                normalized_candidates.append(norm_id)
-        
-        # Usar o primeiro candidato válido ou o ID original
-        best_id = normalized_candidates[0] if normalized_candidates else str(pid)
-        
-        link_agg = next((x for x in links if x), '')
-        sync_agg = next((x for x in syncs if x), '')
-
-        # Kind agregado para ordenação/filtragem
-        agg_rank = max(rank_map.get(kind_c, 0), rank_map.get(kind_r, 0))
-        agg_kind = next((k for k,v in rank_map.items() if v == agg_rank), 'other')
-        groups.append({
-            'id': best_id,
-            'nome': nome,
-            'status_c': status_c,
-            'status_r': status_r,
-            'kind_c': kind_c,
-            'kind_r': kind_r,
-            'resp_c': resp_c,
-            'resp_r': resp_r,
-            'comentarios': comments,
-            'link': link_agg,
-            'sync': sync_agg,
-            'kind': agg_kind,
-        })
-    agg = pd.DataFrame(groups) if groups else fil.head(0).copy()
-    if not agg.empty:
-        agg.sort_values(['nome'], inplace=True)
+    fil['__rank__'] = fil['kind'].cat.codes + 1
+
+    agg = _aggregate_open_tasks(fil)
 
     # Resumo (dedupado)
     st.metric('Total', len(agg))
@@ -611,9 +722,10 @@ def render_list_tab(df: pd.DataFrame, get_thumb: Optional[Callable[[str, str, in
     col1, col2 = st.columns(2)
     
     with col1:
-        # Botão para atualizar miniaturas (força bust de cache variando levemente o tamanho)
+        # Botão para atualizar miniaturas (descarta as miniaturas memoizadas)
         if st.button('🔄 Atualizar miniaturas', key='ls_refresh_thumbs'):
-            st.session_state['ls_thumb_nonce'] = st.session_state.get('ls_thumb_nonce', 0) + 1
+            _cached_thumb.clear()
+            _resolve_thumb.clear()
     
     with col2:
         # Botão para exportar como PNG
@@ -630,7 +742,8 @@ def render_list_tab(df: pd.DataFrame, get_thumb: Optional[Callable[[str, str, in
                     })
                     
                     # Gerar PNG
-                    png_bytes = create_table_png(display_df, get_thumb)
+                    png_bytes = _cached_table_png(_df_digest(display_df), get_thumb is not None,
+                                                  display_df, get_thumb)
                     
                     # Criar download
                     st.download_button(
@@ -649,87 +762,30 @@ def render_list_tab(df: pd.DataFrame, get_thumb: Optional[Callable[[str, str, in
         icon = { 'wip':'🟧', 'review':'🟨', 'todo':'⬜', 'done':'🟩' }.get(k, '⬜')
         return f"{icon} {s or '—'}"
 
+    def _status_resp_col(status: pd.Series, resp: pd.Series) -> List[str]:
+        # Badge calculado uma vez por status distinto; responsável vazio vira '—'
+        status = status.astype(object)
+        badges = status.map({v: _status_badge_text(v) for v in status.unique()})
+        resp = resp.astype(str)
+        return (badges + ' — ' + resp.where(resp.str.strip() != '', '—')).tolist()
+
     thumbs: List[str] = []
-    nonce = int(st.session_state.get('ls_thumb_nonce', 0))
-    thumb_size = 64 + (nonce % 3)
+    thumb_size = 64
     if get_thumb is not None:
-        for _, r in agg.iterrows():
+        # IDs SVB_ de links/sync/comentários extraídos por coluna, fora do laço
+        src_ids = zip(*(_svb_id_col(agg[c]) for c in ('link', 'sync', 'comentarios')))
+        id_nome = agg[['id', 'nome']].astype(str).itertuples(index=False, name=None)
+        for (main_id, nome_char), extra_ids in zip(id_nome, src_ids):
             try:
-                # Estratégia aprimorada de candidatos para thumbnail
-                candidates: List[str] = []
-                nome_char = str(r.get('nome', ''))
-                
-                # 1. ID agregado (primeiro candidato)
-                main_id = str(r.get('id', ''))
-                if main_id:
-                    candidates.append(main_id)
+                # Candidatos na ordem de prioridade: ID agregado, IDs citados em links/sync/comentários
+                # e IDs montados a partir do nome; dict mantém só a primeira grafia de cada um
+                seen: dict = {}
+                for c in (_std_svb_id(main_id) if main_id else '', *extra_ids, *_name_thumb_candidates(nome_char)):
+                    if c:
+                        seen.setdefault(c.upper(), c)
                 
-                # 2. IDs extraídos de outras fontes
-                for src in [r.get('link',''), r.get('sync',''), r.get('comentarios','')]:
-                    extracted = _extract_svb_id(str(src))
-                    if extracted:
-                        candidates.append(extracted)
-                
-                # 3. Construir IDs a partir do nome do personagem
-                if nome_char:
-                    nome_variants = []
-                    
-                    # Nome original limpo
-                    nome_norm = re.sub(r'[^a-zA-Z0-9_]', '_', nome_char.upper().strip())
-                    nome_norm = re.sub(r'_+', '_', nome_norm).strip('_')
-                    if nome_norm:
-                        nome_variants.append(nome_norm)
-                    
-                    # Variações para nomes compostos (ex: "TIA REBIMBOCA DE MOCHILA" -> "TIA_REBIMBOCA")
-                    # Remove palavras conectoras comuns
-                    nome_sem_conectores = re.sub(r'\b(DE|DA|DO|E|COM|PARA|EM|NA|NO)\b', '', nome_char.upper())
-                    nome_sem_conectores = re.sub(r'[^a-zA-Z0-9_]', '_', nome_sem_conectores.strip())
-                    nome_sem_conectores = re.sub(r'_+', '_', nome_sem_conectores).strip('_')
-                    if nome_sem_conectores and nome_sem_conectores != nome_norm:
-                        nome_variants.append(nome_sem_conectores)
-                    
-                    # Primeira palavra + segunda palavra (ex: "TIA_REBIMBOCA")
-                    palavras = [p for p in re.split(r'[_\s]+', nome_char.upper()) if len(p) >= 3]
-                    if len(palavras) >= 2:
-                        nome_curto = f"{palavras[0]}_{palavras[1]}"
-                        nome_variants.append(nome_curto)
-                    
-                    # Adicionar todas as variações
-                    for variant in nome_variants:
-                        if variant:
-                            candidates.extend([
-                                f"SVB_RIG_{variant}",
-                                f"SVB_PER_{variant}",
-                                f"SVB_{variant}",
-                                variant  # Nome puro para fallback
-                            ])
-                    
-                    # Tentar palavras individuais como fallback
-                    for palavra in palavras:
-                        if len(palavra) >= 4:  # Palavras maiores
-                            candidates.extend([
-                                f"SVB_RIG_{palavra}",
-                                f"SVB_PER_{palavra}",
-                                f"SVB_{palavra}"
-                            ])
-                
-                # 4. Normalizar e dedupe preservando ordem
-                seen = set()
-                unique_candidates: List[str] = []
-                for c in candidates:
-                    normalized = _std_svb_id(c) if c else c
-                    if normalized and normalized.upper() not in seen:
-                        seen.add(normalized.upper())
-                        unique_candidates.append(normalized)
-                
-                # 5. Tentar cada candidato até encontrar uma imagem
-                img_data = ''
-                for cid in unique_candidates:
-                    img_data = get_thumb(cid, nome_char, thumb_size) or ''
-                    if img_data:
-                        break
-                
-                thumbs.append(img_data)
+                # Primeiro candidato com imagem (resultado memoizado por personagem)
+                thumbs.append(_resolve_thumb(tuple(seen.values()), nome_char, thumb_size, get_thumb, has_thumb_id))
             except Exception as e:
                 # Debug: log do erro se necessário
                 thumbs.append('')
@@ -739,14 +795,8 @@ def render_list_tab(df: pd.DataFrame, get_thumb: Optional[Callable[[str, str, in
     tdf = pd.DataFrame({
         'Imagem': thumbs,
         'Personagem': agg['nome'].astype(str).tolist(),
-        'Status Rig': [
-            f"{_status_badge_text(s)} — {r if str(r).strip() else '—'}"
-            for s, r in zip(agg['status_r'].tolist(), agg['resp_r'].astype(str).tolist())
-        ],
-        'Status Concept': [
-            f"{_status_badge_text(s)} — {r if str(r).strip() else '—'}"
-            for s, r in zip(agg['status_c'].tolist(), agg['resp_c'].astype(str).tolist())
-        ],
+        'Status Rig': _status_resp_col(agg['status_r'], agg['resp_r']),
+        'Status Concept': _status_resp_col(agg['status_c'], agg['resp_c']),
     })
 
     # Renderização da tabela com imagens
@@ -775,51 +825,38 @@ def render_list_tab(df: pd.DataFrame, get_thumb: Optional[Callable[[str, str, in
     st.subheader('📋 Demandas por Pessoa')
     
     # Criar lista de todas as demandas individuais por responsável (sem duplicatas de personagem)
-    person_tasks = []
-    for _, r in fil.iterrows():
-        # Extrair responsáveis de cada linha
-        resp_names = _split_names(str(r.get('responsavel', '')))
-        for resp in resp_names:
-            if str(resp).strip():
-                person_tasks.append({
-                    'responsavel': resp.strip(),
-                    'personagem': str(r.get('nome', '')),
-                    'etapa': str(r.get('etapa', '')),
-                    'status': str(r.get('status', '')),
-                    'kind': str(r.get('kind', '')),
-                    'episodio': str(r.get('episodio', '')),
-                })
+    _task_cols = ['responsavel', 'nome', 'etapa', 'status', 'kind', 'episodio']
+    tasks = fil[_task_cols].astype(str)
+    # Cada texto distinto de responsáveis é dividido uma vez; explode gera uma linha por nome
+    # (listas vazias viram NaN e são descartadas)
+    resp_lists = {v: _split_names(v) for v in tasks['responsavel'].unique()}
+    person_df = (tasks.assign(responsavel=tasks['responsavel'].map(resp_lists))
+                 .explode('responsavel').dropna(subset=['responsavel'])
+                 .rename(columns={'nome': 'personagem'}).reset_index(drop=True))
     
-    if person_tasks:
+    if not person_df.empty:
         # Agrupar por responsável e personagem para remover duplicatas
-        person_df = pd.DataFrame(person_tasks)
         
         # Agregar por (responsavel, personagem) - combinar etapas
-        agg_person_tasks = []
-        for (resp, char), group in person_df.groupby(['responsavel', 'personagem']):
-            etapas = sorted(group['etapa'].unique())
-            etapa_combined = ' + '.join(etapas)
-            
-            # Pegar o status mais prioritário (wip > review > todo)
-            kinds = group['kind'].tolist()
-            priority_order = {'wip': 3, 'review': 2, 'todo': 1, 'other': 0}
-            best_kind = max(kinds, key=lambda k: priority_order.get(k, 0))
-            best_status = group[group['kind'] == best_kind]['status'].iloc[0]
-            
-            # Pegar episódio (assumindo que é o mesmo para o personagem)
-            episodio = group['episodio'].iloc[0]
-            
-            agg_person_tasks.append({
-                'responsavel': resp,
-                'personagem': char,
-                'etapa': etapa_combined,
-                'status': best_status,
-                'kind': best_kind,
-                'episodio': episodio,
-            })
+        keys = ['responsavel', 'personagem']
+        g = person_df.groupby(keys)
+        etapa_combined = (person_df[keys + ['etapa']].drop_duplicates().sort_values('etapa')
+                          .groupby(keys)['etapa'].agg(' + '.join))
+        # Status mais prioritário (wip > review > todo): ordenação estável por prioridade e a
+        # primeira linha de cada par, como o max() sobre as linhas do grupo
+        priority_order = {'wip': 3, 'review': 2, 'todo': 1, 'other': 0}
+        prio = person_df['kind'].map(priority_order).fillna(0)
+        best = (person_df.assign(__p__=prio).sort_values('__p__', ascending=False, kind='stable')
+                .drop_duplicates(keys).set_index(keys)[['status', 'kind']])
+        # Episódio da primeira linha do par (assumindo que é o mesmo para o personagem)
+        person_df_agg = pd.DataFrame({
+            'etapa': etapa_combined,
+            'status': best['status'],
+            'kind': best['kind'],
+            'episodio': g['episodio'].first(),
+        }, index=etapa_combined.index).reset_index()
         
         # Criar interface com tabs por pessoa
-        person_df_agg = pd.DataFrame(agg_person_tasks)
         responsaveis_unicos = sorted(person_df_agg['responsavel'].unique())
         
         if len(responsaveis_unicos) > 0:
@@ -864,16 +901,12 @@ def render_list_tab(df: pd.DataFrame, get_thumb: Optional[Callable[[str, str, in
                     if not kind_tasks.empty:
                         st.write(f"**{emoji} {kind_name}** ({len(kind_tasks)} personagens):")
                         
-                        task_display = []
-                        for _, task in kind_tasks.iterrows():
-                            task_display.append({
-                                'Personagem': task['personagem'],
-                                'Etapa(s)': task['etapa'],
-                                'Episódio': task['episodio'],
-                                'Status': task['status']
-                            })
-                        
-                        task_df = pd.DataFrame(task_display)
+                        task_df = kind_tasks[['personagem', 'etapa', 'episodio', 'status']].rename(columns={
+                            'personagem': 'Personagem',
+                            'etapa': 'Etapa(s)',
+                            'episodio': 'Episódio',
+                            'status': 'Status',
+                        })
                         st.dataframe(
                             task_df,
                             use_container_width=True,
@@ -6,7 +6,7 @@ Este módulo concentra a lógica de cálculo para ser reutilizada na aba de Esta
 from __future__ import annotations
 from typing import Callable, Tuple, Optional
 import re
-import unicodedata
+import numpy as np
 import pandas as pd
 
 
@@ -14,36 +14,55 @@ def _pct(part: int, total: int) -> float:
     return (part / total * 100.0) if total else 0.0
 
 
-def _norm_key(s: str) -> str:
-    if s is None:
-        return ''
-    s = unicodedata.normalize('NFD', str(s).strip().lower())
-    s = ''.join(ch for ch in s if not unicodedata.combining(ch))
-    return re.sub(r'[^a-z0-9]+', '', s)
+_RE_NORM = re.compile(r'[^a-z0-9]+')
+
+
+def _norm_key_series(s: pd.Series) -> pd.Series:
+    """Chave de personagem por linha: minúsculas, sem acentos e só a-z0-9 (NaN vira 'nan')."""
+    return (s.astype(str).str.lower().str.normalize('NFD')
+            .str.encode('ascii', 'ignore').str.decode('ascii')
+            .str.replace(_RE_NORM, '', regex=True))
+
+
+def _done_mask(s: pd.Series, is_concluido: Callable[[str], bool]) -> pd.Series:
+    """Máscara booleana de concluído; avalia is_concluido uma vez por valor distinto."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # Último item cobre o código -1 (valor ausente)
+        ok = np.array([is_concluido(v) for v in s.cat.categories] + [False], dtype=bool)
+        return pd.Series(ok[s.cat.codes.to_numpy()], index=s.index)
+    done_vals = [v for v in s.unique() if is_concluido(v)]
+    return s.isin(done_vals)
+
+
+def _dedup_keys(df: pd.DataFrame, id_col: Optional[str], name_col: Optional[str]) -> Optional[pd.Series]:
+    """Chave de personagem por linha: ID normalizado (preferencial) ou Nome; None sem as colunas."""
+    if (id_col and id_col in df.columns) or (name_col and name_col in df.columns):
+        empty = pd.Series('', index=df.index, dtype=object)
+        kid = _norm_key_series(df[id_col]) if id_col and id_col in df.columns else empty
+        knm = _norm_key_series(df[name_col]) if name_col and name_col in df.columns else empty
+        return kid.where(kid != '', knm)
+    return None
 
 
 def _dedup_df(df: pd.DataFrame, id_col: Optional[str], name_col: Optional[str]) -> pd.DataFrame:
     """Remove duplicidades por personagem usando ID (preferencial) ou Nome normalizado."""
-    if (id_col and id_col in df.columns) or (name_col and name_col in df.columns):
-        keys = []
-        for _, row in df.iterrows():
-            kid = _norm_key(row.get(id_col, '')) if id_col else ''
-            knm = _norm_key(row.get(name_col, '')) if name_col else ''
-            keys.append(kid or knm)
-        dfx = df.copy()
-        dfx['__UNIQ__'] = keys
-        dfx = dfx.drop_duplicates(subset='__UNIQ__')
-        return dfx
-    return df
+    keys = _dedup_keys(df, id_col, name_col)
+    if keys is None:
+        return df
+    # duplicated() já faz o hash das chaves em C; só as linhas mantidas são copiadas
+    return df[~keys.duplicated().to_numpy()]
 
 
 def overall_stats(df: pd.DataFrame, col_status_conc: str, col_status_rig: str, is_concluido: Callable[[str], bool], id_col: Optional[str] = None, name_col: Optional[str] = None) -> dict:
     """Resumo geral: totais e percentuais por etapa e ambos."""
     dfx = _dedup_df(df, id_col, name_col)
     total = len(dfx)
-    conc_done = int(dfx[col_status_conc].map(is_concluido).sum()) if col_status_conc in dfx.columns else 0
-    rig_done = int(dfx[col_status_rig].map(is_concluido).sum()) if col_status_rig in dfx.columns else 0
-    both_done = int(((dfx[col_status_conc].map(is_concluido)) & (dfx[col_status_rig].map(is_concluido))).sum()) if (col_status_conc in dfx.columns and col_status_rig in dfx.columns) else 0
+    # Cada máscara é calculada uma vez e reaproveitada no 'ambos'
+    mask_c = _done_mask(dfx[col_status_conc], is_concluido) if col_status_conc in dfx.columns else None
+    mask_r = _done_mask(dfx[col_status_rig], is_concluido) if col_status_rig in dfx.columns else None
+    conc_done = int(mask_c.sum()) if mask_c is not None else 0
+    rig_done = int(mask_r.sum()) if mask_r is not None else 0
+    both_done = int((mask_c & mask_r).sum()) if (mask_c is not None and mask_r is not None) else 0
     return {
         'total': total,
         'concept_done': conc_done,
@@ -59,23 +78,17 @@ def episode_completion(exp_df: pd.DataFrame, col_status_conc: str, col_status_ri
     """Conclusão por episódio a partir do DataFrame expandido (uma linha por episódio)."""
     if '__EP_LIST__' not in exp_df.columns:
         return pd.DataFrame(columns=['Episódio', 'Qtd', 'Concept', 'Rig', 'Ambos', '% Ambos'])
-    # Deduplicar por personagem dentro de cada episódio
-    dfl = []
-    for ep, sub in exp_df.groupby('__EP_LIST__'):
-        sub_dedup = _dedup_df(sub, id_col, name_col)
-        sub_dedup = sub_dedup.copy()
-        sub_dedup['__EP_LIST__'] = ep
-        dfl.append(sub_dedup)
-    base = pd.concat(dfl, ignore_index=True) if dfl else exp_df.copy()
-    g = base.groupby('__EP_LIST__')
-    rows = []
-    for ep, sub in g:
-        total = len(sub)
-        c = int(sub[col_status_conc].map(is_concluido).sum())
-        r = int(sub[col_status_rig].map(is_concluido).sum())
-        b = int(((sub[col_status_conc].map(is_concluido)) & (sub[col_status_rig].map(is_concluido))).sum())
-        rows.append({'Episódio': ep, 'Qtd': total, 'Concept': c, 'Rig': r, 'Ambos': b, '% Ambos': _pct(b, total)})
-    return pd.DataFrame(rows).sort_values('Episódio')
+    # Deduplicar por personagem dentro de cada episódio: um drop_duplicates sobre (episódio, chave)
+    keys = _dedup_keys(exp_df, id_col, name_col)
+    base = exp_df if keys is None else exp_df[~pd.MultiIndex.from_arrays([exp_df['__EP_LIST__'], keys]).duplicated()]
+    c = _done_mask(base[col_status_conc], is_concluido)
+    r = _done_mask(base[col_status_rig], is_concluido)
+    # Um único groupby somando as máscaras (Qtd conta as linhas)
+    out = (pd.DataFrame({'Qtd': 1, 'Concept': c, 'Rig': r, 'Ambos': c & r}, index=base.index)
+           .groupby(base['__EP_LIST__']).sum()
+           .rename_axis('Episódio').reset_index())
+    out['% Ambos'] = out['Ambos'] / out['Qtd'] * 100.0
+    return out.sort_values('Episódio')
 
 
 def _count_by(df: pd.DataFrame, col: str) -> pd.DataFrame:
@@ -104,3 +117,15 @@ def responsavel_breakdown(df: pd.DataFrame, col_resp_conc: str, col_resp_rig: st
     rc = _count_by(dfx, col_resp_conc).head(top)
     rr = _count_by(dfx, col_resp_rig).head(top)
     return rc, rr
+
+
+def summary_stats(df: pd.DataFrame, col_status_conc: str, col_status_rig: str, col_urg_conc: str, col_urg_rig: str, col_resp_conc: str, col_resp_rig: str, is_concluido: Callable[[str], bool], top: int = 10, id_col: Optional[str] = None, name_col: Optional[str] = None) -> dict:
+    """Resumo geral e contagens por status, urgência e responsável, deduplicando uma única vez."""
+    dfx = _dedup_df(df, id_col, name_col)
+    # Já deduplicado: sem id_col/name_col as funções abaixo não refazem a deduplicação
+    return {
+        'overall': overall_stats(dfx, col_status_conc, col_status_rig, is_concluido),
+        'status': status_breakdown(dfx, col_status_conc, col_status_rig),
+        'urgency': urgency_breakdown(dfx, col_urg_conc, col_urg_rig),
+        'responsaveis': responsavel_breakdown(dfx, col_resp_conc, col_resp_rig, top=top),
+    }
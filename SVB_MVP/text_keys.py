@@ -0,0 +1,86 @@
+"""
+Normalização de textos e chaves de comparação (status, nomes, IDs, cabeçalhos do CSV).
+
+Fica fora do app.py porque o script principal do Streamlit é reexecutado a cada interação:
+aqui a tabela de acentos e os caches lru_cache são montados uma vez por processo.
+"""
+from __future__ import annotations
+
+import re
+import functools
+import unicodedata
+
+
+# Tabela de tradução que remove marcas combinantes (acentos após NFD).
+# Todas as marcas combinantes do Unicode estão nos planos 0 e 1.
+_COMBINING_TABLE = dict.fromkeys(c for c in range(0x20000) if unicodedata.combining(chr(c)))
+NONALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_text(s: str) -> str:
+    """Normaliza texto: minúsculas, remove acentos/diacríticos e espaços extremos.
+
+    Útil para comparar valores (status, urgência, nomes) de forma robusta.
+    Textos ASCII (a maioria) retornam sem decomposição Unicode. Memoizada: os
+    mesmos poucos valores (status, urgência, responsáveis) se repetem muito.
+    """
+    if not s:
+        return ""
+    s = s.strip().lower()
+    if s.isascii():
+        return s
+    if not unicodedata.is_normalized("NFD", s):
+        s = unicodedata.normalize("NFD", s)
+    return s.translate(_COMBINING_TABLE)
+
+
+@functools.lru_cache(maxsize=4096)
+def norm_key(s: str) -> str:
+    """Cria uma chave "segura" (apenas a-z0-9) a partir de um texto normalizado."""
+    return NONALNUM_RE.sub("", normalize_text(s))
+
+
+@functools.lru_cache(maxsize=4096)
+def strip_prefixes(s: str) -> str:
+    """Remove prefixos comuns de IDs (ex.: 'svb_rig_', 'rig_', 'per_')."""
+    s2 = normalize_text(s)
+    for pref in ("svb_rig_", "svb_per_", "svb_", "rig_", "per_"):
+        if s2.startswith(pref):
+            return s2[len(pref):]
+    return s2
+
+
+@functools.lru_cache(maxsize=4096)
+def image_id_keys(fid: str) -> tuple[str, ...]:
+    """Chaves do índice tentadas pelo ID, na ordem (estratégias 1 e 2 de find_image_for)."""
+    up = fid.upper()
+    if not up.startswith("SVB_"):
+        return ()
+    # Estratégia 1: Match exato do ID
+    ids = [fid]
+    # Estratégia 2: Variações RIG/PER do ID
+    if up.startswith("SVB_RIG_"):
+        # Tenta SVB_PER_ e depois a base SVB_
+        ids += ["SVB_PER_" + fid[8:], "SVB_" + fid[8:]]
+    elif up.startswith("SVB_PER_"):
+        # Tenta SVB_RIG_ e depois a base SVB_
+        ids += ["SVB_RIG_" + fid[8:], "SVB_" + fid[8:]]
+    else:
+        # Para IDs SVB_ simples, tenta adicionar RIG/PER
+        ids += ["SVB_RIG_" + fid[4:], "SVB_PER_" + fid[4:]]
+    return tuple(norm_key(i) for i in ids)
+
+
+@functools.lru_cache(maxsize=1024)
+def resp_style(name: str) -> str:
+    """Cor da pill do responsável via hash simples do nome — um tom por responsável.
+
+    Memoizada: há poucas dezenas de responsáveis, então o laço do hash roda uma vez por nome.
+    """
+    s = norm_key(name or '')
+    h = 0
+    for ch in s:
+        h = (h*31 + ord(ch)) & 0xFFFFFFFF
+    hue = h % 360
+    return f"background:hsl({hue},70%,92%);border-color:#d0d7de;"
@@ -13,6 +13,8 @@ from __future__ import annotations
 
 from typing import Tuple, List
 import re
+import functools
+import numpy as np
 import pandas as pd
 import streamlit as st
 from datetime import datetime
@@ -38,6 +40,33 @@ COL_DATE_RIG = 'Entrega Rig'
 COL_DATE_CONCEPT_DT = 'Entrega Concept (dt)'
 COL_DATE_RIG_DT = 'Entrega Rig (dt)'
 
+_RE_DIGITS = re.compile(r"\d+")
+# Separador das datas nas colunas de revisão ('16/05/2025; 19/05/2025')
+_RE_REV_SPLIT = re.compile(r"[,;]")
+
+
+def _parse_eps(val) -> frozenset:
+    """Episódios de uma célula ('Todos' vira {'ALL'}); frozenset para servir de chave."""
+    if val is None:
+        return frozenset()
+    return _parse_eps_str(str(val).strip())
+
+
+@functools.lru_cache(maxsize=8192)
+def _parse_eps_str(s: str) -> frozenset:
+    # Cache pelo texto da célula: entregas, revisões e a lista de episódios repetem as mesmas strings
+    if not s:
+        return frozenset()
+    if s.lower() == 'todos':
+        return frozenset({'ALL'})
+    return frozenset(int(x) for x in _RE_DIGITS.findall(s))
+
+
+def _eps_mask(eps_sets: pd.Series, sel_eps: set) -> pd.Series:
+    """Linhas de algum episódio selecionado (ou 'Todos'); testa cada conjunto distinto uma vez."""
+    ok = {s: ('ALL' in s) or not s.isdisjoint(sel_eps) for s in eps_sets.unique()}
+    return eps_sets.map(ok).astype(bool)
+
 
 def _ensure_datetime_columns(df: pd.DataFrame) -> pd.DataFrame:
     dfx = df.copy()
@@ -54,60 +83,134 @@ def build_delivery_events(df: pd.DataFrame) -> pd.DataFrame:
     Columns de saída:
     - date (datetime64), etapa ('Concept'|'Rig'), nome, id, episodio, responsavel, status, link, comments
     - concept_dt (datetime64), rig_dt (datetime64) — para cálculo de delta Concept→Rig
+    - _eps_set (frozenset) — episódios da linha, usado pelo filtro de episódios
+    - _nome_lc, _id_lc — nome e ID em minúsculas, usados pela busca
     """
-    dfx = _ensure_datetime_columns(df)
-    recs: List[dict] = []
-    for _, r in dfx.iterrows():
-        nome = str(r.get(COL_NAME, ''))
-        fid = str(r.get(COL_FILE_ID, ''))
-        ep = r.get(COL_EP, '')
-        comments = str(r.get(COL_COMMENTS, ''))
-        d_c = r.get(COL_DATE_CONCEPT_DT)
-        if pd.notna(d_c):
-            recs.append({
-                'date': pd.to_datetime(d_c),
-                'etapa': 'Concept',
-                'nome': nome,
-                'id': fid,
-                'episodio': ep,
-                'responsavel': str(r.get(COL_RESP_CONCEPT, '')),
-                'status': str(r.get(COL_STATUS_CONCEPT, '')),
-                'link': str(r.get(COL_CONCEPT_LINK, '')),
-                'sync': str(r.get(COL_SYNCSKETCH, '')),
-                'comments': comments,
-                'concept_dt': pd.to_datetime(d_c),
-                'rig_dt': pd.to_datetime(r.get(COL_DATE_RIG_DT)) if pd.notna(r.get(COL_DATE_RIG_DT)) else pd.NaT,
-            })
-        d_r = r.get(COL_DATE_RIG_DT)
-        if pd.notna(d_r):
-            recs.append({
-                'date': pd.to_datetime(d_r),
-                'etapa': 'Rig',
-                'nome': nome,
-                'id': fid,
-                'episodio': ep,
-                'responsavel': str(r.get(COL_RESP_RIG, '')),
-                'status': str(r.get(COL_STATUS_RIG, '')),
-                'link': str(r.get(COL_RIG_LINK, '')),
-                'sync': str(r.get(COL_SYNCSKETCH, '')),
-                'comments': comments,
-                'concept_dt': pd.to_datetime(d_c) if pd.notna(d_c) else pd.NaT,
-                'rig_dt': pd.to_datetime(d_r),
-            })
-    if not recs:
-        return pd.DataFrame(columns=['date','etapa','nome','id','episodio','responsavel','status','link','sync','comments','concept_dt','rig_dt','delta_days'])
-    ev = pd.DataFrame.from_records(recs)
-    ev['date'] = pd.to_datetime(ev['date']).dt.normalize()
+    dfx = _ensure_datetime_columns(df).reset_index(drop=True)
+
+    def col(c: str) -> pd.Series:
+        # Texto de cada célula (str(), como na planilha); coluna ausente vira ''
+        return dfx[c].astype(str) if c in dfx.columns else pd.Series('', index=dfx.index, dtype=object)
+
+    def dt(c: str) -> pd.Series:
+        if c in dfx.columns:
+            return pd.to_datetime(dfx[c])
+        return pd.Series(pd.NaT, index=dfx.index, dtype='datetime64[ns]')
+
+    d_c = dt(COL_DATE_CONCEPT_DT)
+    d_r = dt(COL_DATE_RIG_DT)
+    # Campos comuns às duas etapas; concept_dt/rig_dt são as datas da própria linha
+    common = pd.DataFrame({
+        'nome': col(COL_NAME),
+        'id': col(COL_FILE_ID),
+        'episodio': dfx[COL_EP] if COL_EP in dfx.columns else '',
+        'sync': col(COL_SYNCSKETCH),
+        'comments': col(COL_COMMENTS),
+        'concept_dt': d_c,
+        'rig_dt': d_r,
+    }, index=dfx.index)
+    concept = common.assign(date=d_c, etapa='Concept', responsavel=col(COL_RESP_CONCEPT),
+                            status=col(COL_STATUS_CONCEPT), link=col(COL_CONCEPT_LINK))[d_c.notna()]
+    rig = common.assign(date=d_r, etapa='Rig', responsavel=col(COL_RESP_RIG),
+                        status=col(COL_STATUS_RIG), link=col(COL_RIG_LINK))[d_r.notna()]
+    if concept.empty and rig.empty:
+        return pd.DataFrame(columns=['date','etapa','nome','id','episodio','responsavel','status','link','sync','comments','concept_dt','rig_dt','delta_days','_eps_set','_nome_lc','_id_lc'])
+    # Linha a linha (Concept antes de Rig), a mesma ordem de entrada da versão por registros
+    ev = pd.concat([concept, rig]).sort_index(kind='stable').reset_index(drop=True)
+    ev = ev[['date','etapa','nome','id','episodio','responsavel','status','link','sync','comments','concept_dt','rig_dt']]
+    ev['date'] = ev['date'].dt.normalize()
+    # Episódios de cada entrega, para o filtro não reprocessar o texto a cada rerun
+    ev['_eps_set'] = ev['episodio'].map(_parse_eps)
+    # Nome/ID em minúsculas para a busca (evita refazer o lower() a cada tecla)
+    ev['_nome_lc'] = ev['nome'].str.lower()
+    ev['_id_lc'] = ev['id'].str.lower()
     # Garantir dtype datetime
     ev['concept_dt'] = pd.to_datetime(ev.get('concept_dt'))
     ev['rig_dt'] = pd.to_datetime(ev.get('rig_dt'))
     # Delta em dias (apenas fará sentido para etapa=Rig)
-    with pd.option_context('mode.use_inf_as_na', True):
-        ev['delta_days'] = (ev['rig_dt'] - ev['concept_dt']).dt.days
+    # Subtração direta: NaT em qualquer lado já resulta em NaN
+    ev['delta_days'] = (ev['rig_dt'] - ev['concept_dt']).dt.days
     ev.sort_values(['date','etapa','nome'], inplace=True)
     return ev
 
 
+@st.cache_data(show_spinner=False)
+def build_revision_events(df: pd.DataFrame) -> pd.DataFrame:
+    """Gera uma linha por data de revisão (Concept ou Rig) listada nas colunas de revisões.
+
+    Columns de saída: date (datetime64, dia), etapa, nome, responsavel, episodio, _eps_set, _nome_lc.
+    Cacheada: só é refeita quando o DataFrame de produção muda, não a cada filtro.
+    """
+    def _txt(c: str) -> np.ndarray:
+        return df[c].astype(str).to_numpy() if c in df.columns else np.full(len(df), '', dtype=object)
+
+    # Todas as datas de revisão numa lista só (com a linha e a etapa de cada uma),
+    # convertidas por um único to_datetime
+    rev_toks: List[str] = []
+    rev_pos: List[int] = []
+    rev_etapa: List[str] = []
+    raw_c = df[COL_REV_CONCEPT].fillna('').astype(str) if COL_REV_CONCEPT in df.columns else [''] * len(df)
+    raw_r = df[COL_REV_RIG].fillna('').astype(str) if COL_REV_RIG in df.columns else [''] * len(df)
+    for i, raws in enumerate(zip(raw_c, raw_r)):
+        for etapa, raw in zip(('Concept', 'Rig'), raws):
+            for tok in _RE_REV_SPLIT.split(raw):
+                tok = tok.strip()
+                if tok:
+                    rev_toks.append(tok)
+                    rev_pos.append(i)
+                    rev_etapa.append(etapa)
+    # format='mixed': cada token é interpretado por si (não herda o formato do primeiro)
+    rev_dates = pd.to_datetime(pd.Series(rev_toks, dtype=object), errors='coerce', dayfirst=True, format='mixed')
+    ok = rev_dates.notna().to_numpy()
+    if ok.any():
+        pos = np.asarray(rev_pos, dtype=np.intp)[ok]
+        rev_etapa_ok = np.asarray(rev_etapa, dtype=object)[ok]
+        ep_vals = df[COL_EP].to_numpy() if COL_EP in df.columns else np.full(len(df), '', dtype=object)
+        rev = pd.DataFrame({
+            'date': rev_dates[ok].dt.normalize().to_numpy(),
+            'etapa': rev_etapa_ok,
+            'nome': _txt(COL_NAME)[pos],
+            'responsavel': np.where(rev_etapa_ok == 'Concept', _txt(COL_RESP_CONCEPT)[pos], _txt(COL_RESP_RIG)[pos]),
+            'episodio': ep_vals[pos],
+        })
+        rev['_eps_set'] = rev['episodio'].map(_parse_eps)
+        rev['_nome_lc'] = rev['nome'].str.lower()
+        return rev
+    return pd.DataFrame(columns=['date','etapa','nome','responsavel','episodio','_eps_set','_nome_lc'])
+
+
+def _count_names_by_day(frame: pd.DataFrame) -> pd.DataFrame:
+    """Quantidade e nomes distintos (ordenados, separados por vírgula) por dia+etapa, para o tooltip."""
+    keys = ['date', 'etapa']
+    count = frame.groupby(keys)['nome'].count()
+    # Nomes não vazios, sem repetição no mesmo dia/etapa, já na ordem alfabética antes de juntar
+    nm = frame['nome'].astype(str)
+    keep = (nm.str.strip() != '').to_numpy()
+    named = (frame.loc[keep, keys].assign(nome=nm.to_numpy()[keep])
+             .drop_duplicates().sort_values('nome', kind='stable'))
+    nomes = named.groupby(keys)['nome'].agg(', '.join).reindex(count.index, fill_value='')
+    return pd.DataFrame({'count': count, 'nomes': nomes}).reset_index()
+
+
+def _delivery_items_md(g: pd.DataFrame, with_delta: bool) -> str:
+    """Lista (markdown com HTML) das entregas de um dia numa etapa: um único st.markdown por coluna."""
+    items: List[str] = []
+    for t in g.itertuples(index=False):
+        delta_txt = ''
+        if with_delta and pd.notna(t.delta_days):
+            delta_txt = f" • Tempo Concept→Rig: {int(t.delta_days)} dias"
+        links_html = ' '.join([
+            f"<a href='{t.link}' target='_blank'>Link</a>" if t.link else '',
+            f"<a href='{t.sync}' target='_blank'>SyncSketch</a>" if t.sync else '',
+        ])
+        items.append(
+            f"- {t.nome} <code>{t.id}</code> "
+            f"<span style='opacity:0.8'>[Ep: {t.episodio}] • Resp: {t.responsavel or '—'} • Status: {t.status or '—'}{delta_txt}</span> "
+            f"{links_html}<br><span style='opacity:0.8'>{t.comments or ''}</span>"
+        )
+    return '\n'.join(items)
+
+
 def render_timeline_tab(df: pd.DataFrame):
     """Renderiza a aba 'Histórico' (linha do tempo de entregas)."""
     st.subheader('Histórico de Entregas — Linha do tempo')
@@ -123,17 +226,9 @@ def render_timeline_tab(df: pd.DataFrame):
     q = st.text_input('Buscar por nome ou ID', key='tl_search')
 
     # Filtro por Episódio (personagens que aparecem no episódio)
-    def _parse_eps(val) -> set:
-        if val is None:
-            return set()
-        s = str(val).strip()
-        if not s:
-            return set()
-        if s.lower() == 'todos':
-            return {'ALL'}
-        return {int(x) for x in re.findall(r"\d+", s)}
-
-    all_eps = sorted({e for v in df.get(COL_EP, []).tolist() for e in _parse_eps(v) if isinstance(e, int)})
+    # Só os valores distintos da coluna são analisados
+    ep_vals = df[COL_EP].unique() if COL_EP in df.columns else []
+    all_eps = sorted({e for v in ep_vals for e in _parse_eps(v) if isinstance(e, int)})
     sel_eps = st.multiselect('Episódios', options=all_eps, default=all_eps, key='tl_eps')
     sel_eps_set = set(sel_eps)
 
@@ -149,87 +244,48 @@ def render_timeline_tab(df: pd.DataFrame):
     fil = ev.copy()
     # Episódio filter on deliveries
     if sel_eps and sel_eps_set and len(sel_eps_set) != 0 and len(sel_eps_set) != len(all_eps):
-        mask_ep = fil['episodio'].apply(lambda v: ('ALL' in _parse_eps(v)) or (len(_parse_eps(v) & sel_eps_set) > 0))
-        fil = fil[mask_ep]
+        fil = fil[_eps_mask(fil['_eps_set'], sel_eps_set)]
     if etapas:
         fil = fil[fil['etapa'].isin(etapas)]
     if sel_resps:
         fil = fil[fil['responsavel'].isin(sel_resps)]
     if q:
         qn = str(q).strip().lower()
-        fil = fil[(fil['nome'].str.lower().str.contains(qn)) | (fil['id'].str.lower().str.contains(qn))]
+        fil = fil[fil['_nome_lc'].str.contains(qn, regex=False) | fil['_id_lc'].str.contains(qn, regex=False)]
     if d_ini:
         fil = fil[fil['date'] >= pd.to_datetime(d_ini)]
     if d_fim:
         fil = fil[fil['date'] <= pd.to_datetime(d_fim)]
+    if fil.empty:
+        # Sem entregas nos filtros: nem gráfico nem revisões a montar
+        st.info('Nenhuma entrega encontrada para os filtros selecionados.')
+        return
 
     # Gráfico: Linha do tempo com marcações de entregas (por etapa)
     try:
         import altair as alt  # import local
         # Agregar por dia+etapa para termos um ponto por dia, com lista de nomes no tooltip
-        agg = (
-            fil.groupby(['date', 'etapa'])
-               .agg(
-                   count=('nome', 'count'),
-                   nomes=('nome', lambda s: ', '.join(sorted({str(x) for x in s if str(x).strip()})))
-               )
-               .reset_index()
-        )
-        # Construir marcos de revisão (Concept/Rig) como traços verticais
-        rev_recs = []
-        for _, r in df.iterrows():
-            nome = str(r.get(COL_NAME, ''))
-            ep_raw = r.get(COL_EP, '')
-            # Concept revisions
-            raw_c = str(r.get(COL_REV_CONCEPT, '') or '')
-            if raw_c.strip():
-                for tok in raw_c.replace(',', ';').split(';'):
-                    d = pd.to_datetime(tok.strip(), errors='coerce', dayfirst=True)
-                    if pd.notna(d):
-                        rev_recs.append({
-                            'date': pd.to_datetime(d).normalize(),
-                            'etapa': 'Concept',
-                            'nome': nome,
-                            'responsavel': str(r.get(COL_RESP_CONCEPT, '')),
-                            'episodio': ep_raw,
-                        })
-            # Rig revisions
-            raw_r = str(r.get(COL_REV_RIG, '') or '')
-            if raw_r.strip():
-                for tok in raw_r.replace(',', ';').split(';'):
-                    d = pd.to_datetime(tok.strip(), errors='coerce', dayfirst=True)
-                    if pd.notna(d):
-                        rev_recs.append({
-                            'date': pd.to_datetime(d).normalize(),
-                            'etapa': 'Rig',
-                            'nome': nome,
-                            'responsavel': str(r.get(COL_RESP_RIG, '')),
-                            'episodio': ep_raw,
-                        })
-        rev = pd.DataFrame.from_records(rev_recs) if rev_recs else pd.DataFrame(columns=['date','etapa','nome','responsavel','episodio'])
+        agg = _count_names_by_day(fil)
+        # Marcos de revisão (Concept/Rig) como traços verticais
+        rev = build_revision_events(df)
         # Aplicar mesmos filtros nas revisões
         if not rev.empty:
             # Episódio filter on revisions
             if sel_eps and sel_eps_set and len(sel_eps_set) != 0 and len(sel_eps_set) != len(all_eps):
-                rev = rev[rev['episodio'].apply(lambda v: ('ALL' in _parse_eps(v)) or (len(_parse_eps(v) & sel_eps_set) > 0))]
+                rev = rev[_eps_mask(rev['_eps_set'], sel_eps_set)]
             if etapas:
                 rev = rev[rev['etapa'].isin(etapas)]
             if sel_resps:
                 rev = rev[rev['responsavel'].isin(sel_resps)]
             if q:
                 qn = str(q).strip().lower()
-                rev = rev[rev['nome'].str.lower().str.contains(qn)]
+                rev = rev[rev['_nome_lc'].str.contains(qn, regex=False)]
             if d_ini:
                 rev = rev[rev['date'] >= pd.to_datetime(d_ini)]
             if d_fim:
                 rev = rev[rev['date'] <= pd.to_datetime(d_fim)]
         # Agregar revisões por dia+etapa para tooltip
-        rev_agg = (
-            rev.groupby(['date','etapa']).agg(
-                count=('nome','count'),
-                nomes=('nome', lambda s: ', '.join(sorted({str(x) for x in s if str(x).strip()})))
-            ).reset_index()
-        ) if not rev.empty else pd.DataFrame(columns=['date','etapa','count','nomes'])
+        rev_agg = _count_names_by_day(rev) if not rev.empty else pd.DataFrame(columns=['date','etapa','count','nomes'])
         if not agg.empty:
             base = alt.Chart(agg).properties(height=220)
             # Regra horizontal por etapa, do primeiro ao último dia
@@ -287,39 +343,11 @@ def render_timeline_tab(df: pd.DataFrame):
             if g_c.empty:
                 st.markdown("_Sem entregas de Concept_")
             else:
-                for _, r in g_c.iterrows():
-                    nm = r['nome']; fid = r['id']; ep = r['episodio']
-                    resp = r['responsavel']; status = r['status']
-                    link = r['link']; sync = r['sync']; comments = r['comments']
-                    links_html = ' '.join([
-                        f"<a href='{link}' target='_blank'>Link</a>" if link else '',
-                        f"<a href='{sync}' target='_blank'>SyncSketch</a>" if sync else '',
-                    ])
-                    st.markdown(
-                        f"- {nm} <code>{fid}</code> "
-                        f"<span style='opacity:0.8'>[Ep: {ep}] • Resp: {resp or '—'} • Status: {status or '—'}</span> "
-                        f"{links_html}<br><span style='opacity:0.8'>{comments or ''}</span>",
-                        unsafe_allow_html=True,
-                    )
+                st.markdown(_delivery_items_md(g_c, with_delta=False), unsafe_allow_html=True)
         with col_r:
             st.markdown("**Rig**")
             g_r = grp[grp['etapa'] == 'Rig'].sort_values(['nome'])
             if g_r.empty:
                 st.markdown("_Sem entregas de Rig_")
             else:
-                for _, r in g_r.iterrows():
-                    nm = r['nome']; fid = r['id']; ep = r['episodio']
-                    resp = r['responsavel']; status = r['status']
-                    link = r['link']; sync = r['sync']; comments = r['comments']
-                    delta = r.get('delta_days')
-                    delta_txt = f" • Tempo Concept→Rig: {int(delta)} dias" if pd.notna(delta) else ''
-                    links_html = ' '.join([
-                        f"<a href='{link}' target='_blank'>Link</a>" if link else '',
-                        f"<a href='{sync}' target='_blank'>SyncSketch</a>" if sync else '',
-                    ])
-                    st.markdown(
-                        f"- {nm} <code>{fid}</code> "
-                        f"<span style='opacity:0.8'>[Ep: {ep}] • Resp: {resp or '—'} • Status: {status or '—'}{delta_txt}</span> "
-                        f"{links_html}<br><span style='opacity:0.8'>{comments or ''}</span>",
-                        unsafe_allow_html=True,
-                    )
+                st.markdown(_delivery_items_md(g_r, with_delta=True), unsafe_allow_html=True)